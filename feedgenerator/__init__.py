@@ -3,5 +3,5 @@ feedgenerator package.
 """
 # Import these for bw compatibility.
 from feedgenerator.generator import (RssUserland091Feed, Rss201rev2Feed,
-    Atom1Feed, DefaultFeed, Enclosure, rfc3339_date, rfc2822_date,
+    Atom1Feed, JsonFeed, DefaultFeed, Enclosure, rfc3339_date, rfc2822_date,
     get_tag_uri, new_random_urn)
@@ -0,0 +1,172 @@
+"""
+Builds feed files in bulk from JSON Lines definitions.
+
+Usage: python -m feedgenerator [-o DIR] [-j N] [FILE]
+
+Each line of FILE (default: standard input) defines one feed:
+
+    {"output": "news.atom", "format": "atom",
+     "feed": {"title": "News", "link": "http://example.org/"},
+     "entries": [{"title": "Hello", "updated": "2013-04-01T12:00:00Z",
+                  "author": "Twilight Sparkle"}]}
+
+"feed" holds the keyword arguments of the feed class and each of "entries"
+those of its add_entry(). "format" is one of atom (the default), rss,
+rss091 and json; "encoding" defaults to utf-8. Dates are given in ISO 8601
+and converted to naive UTC datetimes. An RSS "enclosure" is given as an
+object with url, length and mime_type.
+
+Feeds are written to the output directory by N worker processes, and a
+timing summary is printed at the end.
+"""
+import datetime
+import errno
+import json
+import optparse
+import os
+import re
+import sys
+import time
+from multiprocessing import Pool
+from feedgenerator.generator import (Atom1Feed, Enclosure, JsonFeed,
+    Rss201rev2Feed, RssUserland091Feed)
+
+FEED_CLASSES = {
+    'atom': Atom1Feed,
+    'rss': Rss201rev2Feed,
+    'rss091': RssUserland091Feed,
+    'json': JsonFeed,
+}
+DATE_KEYS = ('updated', 'published', 'pubdate')
+DATE_RE = re.compile(
+    r'^(\d{4})-(\d\d)-(\d\d)(?:[T ](\d\d):(\d\d)(?::(\d\d)(?:\.(\d{1,6}))?)?)?'
+    r'(Z|[+-]\d\d:?\d\d)?$')
+
+
+def parse_date(value):
+    """
+    Parses an ISO 8601 date or date and time into a naive UTC datetime.
+    """
+    match = DATE_RE.match(value)
+    if match is None:
+        raise ValueError('Invalid date %r.' % value)
+    year, month, day, hour, minute, second, fraction, zone = match.groups()
+    date = datetime.datetime(
+        int(year), int(month), int(day), int(hour or 0), int(minute or 0),
+        int(second or 0), int((fraction or '0').ljust(6, '0')))
+    if zone and zone != 'Z':
+        sign = -1 if zone[0] == '-' else 1
+        zone = zone[1:].replace(':', '')
+        date -= sign * datetime.timedelta(hours=int(zone[:2]),
+                                          minutes=int(zone[2:]))
+    return date
+
+
+def convert_dates(kwargs):
+    for key in DATE_KEYS:
+        if kwargs.get(key) is not None:
+            kwargs[key] = parse_date(kwargs[key])
+    return kwargs
+
+
+def build_feed(definition):
+    """
+    Returns the feed described by a definition dict (see module docstring).
+    """
+    cls = FEED_CLASSES[definition.get('format', 'atom')]
+    feed = cls(**convert_dates(dict(definition['feed'])))
+    entries = []
+    for kwargs in definition.get('entries', ()):
+        kwargs = convert_dates(dict(kwargs))
+        if isinstance(kwargs.get('enclosure'), dict):
+            kwargs['enclosure'] = Enclosure(**kwargs['enclosure'])
+        entries.append(kwargs)
+    feed.add_entries(*entries)
+    return feed
+
+
+def output_path(output_dir, name):
+    """
+    Returns the path to write the output name to, creating the directories
+    it needs. Raises ValueError if it is not inside output_dir.
+    """
+    directory = os.path.realpath(output_dir)
+    path = os.path.realpath(os.path.join(directory, name))
+    if os.path.isabs(name) or not path.startswith(
+            os.path.join(directory, '')):
+        raise ValueError('Output %r is outside of the output directory.'
+                         % name)
+    try:
+        os.makedirs(os.path.dirname(path))
+    except OSError, e:
+        # Another worker may have just created it.
+        if e.errno != errno.EEXIST:
+            raise
+    return path
+
+
+def render(args):
+    """
+    Builds and writes the feed defined by a JSON line. Returns a tuple of
+    the output name, the number of entries, the number of bytes written and
+    the seconds taken, or of the output name (or line number) and an error
+    message.
+    """
+    output_dir, lineno, line = args
+    started = time.time()
+    name = u'line %d' % lineno
+    try:
+        definition = json.loads(line, object_hook=lambda d: dict(
+            (str(key), value) for key, value in d.iteritems()))
+        name = definition['output']
+        feed = build_feed(definition)
+        with open(output_path(output_dir, name), 'wb') as fp:
+            feed.write(fp, definition.get('encoding', 'utf-8'))
+            size = fp.tell()
+    except Exception, e:
+        return name, u'%s: %s' % (e.__class__.__name__, e)
+    return name, len(feed), size, time.time() - started
+
+
+def main(argv=None, stdout=sys.stdout):
+    parser = optparse.OptionParser(
+        usage='%prog [-o DIR] [-j N] [FILE]',
+        description='Builds feed files from JSON Lines definitions.')
+    parser.add_option('-o', '--output-dir', default='.',
+                      help='directory to write the feeds to [%default]')
+    parser.add_option('-j', '--jobs', type='int', default=1,
+                      help='number of worker processes [%default]')
+    options, args = parser.parse_args(argv)
+    if len(args) > 1:
+        parser.error('Expected at most one input file.')
+    infile = open(args[0]) if args and args[0] != '-' else sys.stdin
+    jobs = ((options.output_dir, lineno, line)
+            for lineno, line in enumerate(infile, 1) if line.strip())
+    started = time.time()
+    if options.jobs > 1:
+        pool = Pool(options.jobs)
+        results = pool.imap_unordered(render, jobs)
+    else:
+        pool = None
+        results = (render(job) for job in jobs)
+    built, failed = [], []
+    for result in results:
+        (built if len(result) == 4 else failed).append(result)
+    if infile is not sys.stdin:
+        infile.close()
+    if pool is not None:
+        pool.close()
+        pool.join()
+    for name, entries, size, seconds in sorted(
+            built, key=lambda result: result[3], reverse=True):
+        stdout.write(u'%8.3fs %10d bytes %6d entries  %s\n'
+                     % (seconds, size, entries, name))
+    for name, error in failed:
+        stdout.write(u'  FAILED %s: %s\n' % (name, error))
+    stdout.write(u'%d feeds built, %d failed in %.3fs\n'
+                 % (len(built), len(failed), time.time() - started))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
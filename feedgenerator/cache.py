@@ -0,0 +1,310 @@
+"""
+Caches of rendered feeds.
+
+SharedRenderCache shares rendered feeds between processes, e.g. the
+pre-forked workers of a web server:
+
+>>> from feedgenerator.cache import SharedRenderCache
+>>> cache = SharedRenderCache('/dev/shm/feeds', compression='gzip')
+>>> data = cache.get('news', feed)
+
+The first process to ask for a feed in its current state renders it; all
+others map the stored bytes into memory.
+
+RenderCache keeps renders in the memory of one process:
+
+>>> from feedgenerator.cache import RenderCache
+>>> cache = RenderCache(max_bytes=32 * 1024 * 1024)
+>>> data = cache.get(feed, 'utf-8', 'gzip')
+
+Both caches check the feed's fingerprint on every lookup, so a render is
+never served after the feed's entries, meta data or settings changed. The
+fingerprint remembers the digest of the entries, so a lookup only digests
+the meta data, whatever the number of entries; after changing entries in
+place, call the feed's changed().
+"""
+import errno
+import fcntl
+import gzip
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from StringIO import StringIO
+from feedgenerator.utils.files import AtomicFile
+
+COMPRESSIONS = (None, 'gzip')
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def compress(data, compression):
+    """
+    Returns data compressed with the named compression (None or "gzip").
+    Equal input gives equal output, as no timestamp is embedded.
+    """
+    if compression is None:
+        return data
+    if compression == 'gzip':
+        buf = StringIO()
+        with gzip.GzipFile(fileobj=buf, mode='wb', mtime=0) as gz:
+            gz.write(data)
+        return buf.getvalue()
+    raise ValueError('Unsupported compression %r.' % (compression,))
+
+
+class SharedRenderCache(object):
+    """
+    Rendered feeds stored as files in directory, which should live on a
+    memory-backed file system such as /dev/shm, and read through mmap.
+
+    A file's name is derived from the cache key, the feed's fingerprint, the
+    encoding and the compression, so the directory itself is the index.
+    Files are written under a temporary name and renamed into place, so
+    readers need no locks and never see partial data. Processes missing the
+    same file take turns through an flock on a lock file, so only the first
+    renders it and the others map what it stored.
+    An instance removes a render once its own feed has moved on from it.
+    Instances can be shared between threads.
+    """
+    def __init__(self, directory, compression=None):
+        if compression not in COMPRESSIONS:
+            raise ValueError('Unsupported compression %r.' % (compression,))
+        self.directory = directory
+        self.compression = compression
+        self._maps = {}
+        self._lock = threading.Lock()
+        try:
+            os.makedirs(directory)
+        except OSError, e:
+            if e.errno != errno.EEXIST:
+                raise
+
+    def _prefix(self, key, encoding):
+        return u'%s.%s.%s.' % (
+            hashlib.sha1(key.encode('utf-8')).hexdigest(),
+            encoding.lower(), self.compression or 'plain')
+
+    def get(self, key, feed, encoding='utf-8'):
+        """
+        Returns feed rendered in encoding (and compressed, if the cache
+        compresses) as a read-only mmap, rendering and storing it first if
+        no process has done so for the feed's current fingerprint.
+
+        The mmap supports len(), slicing and the buffer interface, so it can
+        be sent without copying it. It stays valid while it is referenced,
+        even after the file is replaced or removed.
+        """
+        prefix = self._prefix(key, encoding)
+        name = prefix + feed.fingerprint()
+        with self._lock:
+            cached = self._maps.get(prefix)
+        if cached is not None and cached[0] == name:
+            return cached[1]
+        try:
+            fd = os.open(os.path.join(self.directory, name), os.O_RDONLY)
+        except OSError, e:
+            if e.errno != errno.ENOENT:
+                raise
+            fd = self._render(name, feed, encoding)
+        try:
+            data = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        with self._lock:
+            previous = self._maps.get(prefix)
+            self._maps[prefix] = (name, data)
+        # Only the render this process moved on from is known to be stale;
+        # other processes may still be at states of their own.
+        if previous is not None and previous[0] != name:
+            self._remove(previous[0])
+        return data
+
+    def _render(self, name, feed, encoding):
+        """
+        Returns a descriptor open on the file name, which this process
+        renders and stores unless another one did so while it waited for
+        the lock on name.
+        """
+        lock_path = os.path.join(self.directory, '.lock.' + name)
+        lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0600)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+            try:
+                return os.open(os.path.join(self.directory, name),
+                               os.O_RDONLY)
+            except OSError, e:
+                if e.errno != errno.ENOENT:
+                    raise
+            return self._store(name, feed, encoding)
+        finally:
+            # Removed while still locked: processes waiting on it then find
+            # the file, and later ones lock a new lock file and find it too.
+            self._remove('.lock.' + name)
+            os.close(lock_fd)
+
+    def _store(self, name, feed, encoding):
+        """
+        Renders feed into the file name and returns a descriptor open on
+        it, which stays valid whatever other processes do to the file.
+        """
+        data = compress(feed.write_string(encoding), self.compression)
+        # Renders are cheap to redo, so they are not synced to disk.
+        fp = AtomicFile(os.path.join(self.directory, name), sync=False)
+        try:
+            fp.write(data)
+            fd = os.dup(fp.fileno())
+        except:
+            fp.discard()
+            raise
+        try:
+            fp.commit()
+        except:
+            os.close(fd)
+            raise
+        return fd
+
+    def _remove(self, name):
+        try:
+            os.unlink(os.path.join(self.directory, name))
+        except OSError, e:
+            if e.errno != errno.ENOENT:
+                raise
+
+    def close(self):
+        """
+        Drops all feeds mapped by this instance, unmapping them once no
+        longer referenced.
+        """
+        with self._lock:
+            self._maps.clear()
+
+
+class RenderCache(object):
+    """
+    A cache of rendered feeds in process memory, bounded by the total size
+    of the renders and evicting the least recently used ones first.
+
+    Renders are cached per feed, encoding and compression; a feed is
+    identified by the key passed to get() or, failing that, by its id().
+
+    Renders of at least spill_size bytes are kept in files in spill_dir
+    (a temporary directory by default) instead of memory, from where
+    sendfile() passes them to a socket or file without copying them through
+    Python where the platform allows.
+    """
+    def __init__(self, max_bytes=16 * 1024 * 1024, spill_size=None,
+                 spill_dir=None):
+        self.max_bytes = max_bytes
+        self.spill_size = spill_size
+        self.spill_dir = spill_dir
+        self.size = 0
+        self._renders = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, feed, encoding, compression, key):
+        """
+        Returns (data, fp) for the feed's current render, rendering and
+        caching it first if needed. Cached renders kept in a file come as
+        fp, a file open on it that the caller must close, without data; all
+        others without fp. Files are opened while the lock is held, so they
+        stay readable even if the render is evicted right after.
+        """
+        if key is None:
+            key = id(feed)
+        cache_key = (key, encoding.lower(), compression)
+        fingerprint = feed.fingerprint()
+        with self._lock:
+            cached = self._renders.pop(cache_key, None)
+            if cached is not None:
+                if cached[0] == fingerprint:
+                    if cached[2] is None:
+                        self._renders[cache_key] = cached
+                        return cached[1], None
+                    try:
+                        fp = open(cached[2], 'rb')
+                    except IOError, e:
+                        # Removed by someone else; render it again.
+                        if e.errno != errno.ENOENT:
+                            raise
+                    else:
+                        self._renders[cache_key] = cached
+                        return None, fp
+                self._discard(cached)
+        data = compress(feed.write_string(encoding), compression)
+        path = fp = None
+        if self.spill_size is not None and len(data) >= self.spill_size:
+            fd, path = tempfile.mkstemp(dir=self.spill_dir, prefix='feed')
+            fp = os.fdopen(fd, 'w+b')
+            fp.write(data)
+            fp.flush()
+            fp.seek(0)
+        cached = (fingerprint, None if path else data, path, len(data))
+        with self._lock:
+            if cached[3] <= self.max_bytes:
+                self._discard(self._renders.pop(cache_key, None))
+                self._renders[cache_key] = cached
+                self.size += cached[3]
+                while self.size > self.max_bytes:
+                    self._discard(self._renders.popitem(last=False)[1])
+            elif path is not None:
+                os.unlink(path)
+        if fp is not None:
+            return None, fp
+        return data, None
+
+    def _discard(self, cached):
+        if cached is None:
+            return
+        self.size -= cached[3]
+        if cached[2] is not None:
+            try:
+                os.unlink(cached[2])
+            except OSError, e:
+                if e.errno != errno.ENOENT:
+                    raise
+
+    def get(self, feed, encoding='utf-8', compression=None, key=None):
+        """
+        Returns feed rendered in encoding and compressed with compression
+        (None or "gzip"), from the cache if the feed has not changed since.
+        """
+        data, fp = self._lookup(feed, encoding, compression, key)
+        if data is None:
+            with fp:
+                data = fp.read()
+        return data
+
+    def sendfile(self, out, feed, encoding='utf-8', compression=None,
+                 key=None):
+        """
+        Writes the render get() would return to out, a file descriptor or an
+        object with a fileno() such as a socket, and returns its size.
+        """
+        if not isinstance(out, (int, long)):
+            out = out.fileno()
+        data, fp = self._lookup(feed, encoding, compression, key)
+        if data is not None:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(out, view):]
+            return len(data)
+        with fp:
+            size = os.fstat(fp.fileno()).st_size
+            if hasattr(os, 'sendfile'):
+                offset = 0
+                while offset < size:
+                    offset += os.sendfile(out, fp.fileno(), offset,
+                                          size - offset)
+            else:
+                for chunk in iter(lambda: fp.read(DEFAULT_CHUNK_SIZE), ''):
+                    view = memoryview(chunk)
+                    while view:
+                        view = view[os.write(out, view):]
+        return size
+
+    def clear(self):
+        with self._lock:
+            while self._renders:
+                self._discard(self._renders.popitem()[1])
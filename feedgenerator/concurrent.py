@@ -0,0 +1,204 @@
+"""
+Feeds that threads can add entries to while other threads render them.
+
+Sample usage:
+
+>>> from feedgenerator.concurrent import ConcurrentAtom1Feed
+>>> feed = ConcurrentAtom1Feed(title=u'News')
+>>> feed.add_entry(...)  # from any thread
+>>> feed.write(fp)       # from any other thread
+
+write() renders a snapshot taken when it starts, so a render never sees
+entries added during it and appends never wait for a render to finish.
+"""
+import copy_reg
+import threading
+from itertools import chain, islice
+from feedgenerator.generator import Atom1Feed, Rss201rev2Feed
+
+
+class ConcurrentFeedMixin(object):
+    """
+    Keeps a feed's entries in full, immutable chunks of chunk_size entries
+    plus a short list of the latest entries. Appending only ever touches
+    the latter (and appends a chunk when it fills up), so it takes constant
+    time. A snapshot shares the chunks and copies at most chunk_size - 1
+    entries.
+
+    Appending entries (append(), extend(), add_entry(), add_entries()) is
+    cheap; other changes to the entries rebuild the chunks. Snapshots are
+    read-only.
+
+    Mix in before the feed class: class MyFeed(ConcurrentFeedMixin, Atom1Feed)
+    """
+    chunk_size = 64
+
+    def __new__(cls, *args, **kwargs):
+        feed = super(ConcurrentFeedMixin, cls).__new__(cls, *args, **kwargs)
+        feed._lock = threading.Lock()
+        feed._chunks = []
+        feed._tail = []
+        feed._frozen = None
+        feed._entries_digest = [(0, '')]
+        return feed
+
+    def _view(self):
+        "Returns (chunks, number of chunks, tail) of the current entries."
+        if self._frozen is not None:
+            return self._frozen
+        with self._lock:
+            return self._chunks, len(self._chunks), tuple(self._tail)
+
+    def snapshot(self):
+        """
+        Returns a read-only feed of the same class, meta data and settings
+        holding the entries as they are now.
+        """
+        if self._frozen is not None:
+            view, memo = self._frozen, self._entries_digest
+        else:
+            with self._lock:
+                view = self._chunks, len(self._chunks), tuple(self._tail)
+                # Taken with the entries, which it has to match.
+                memo = self._entries_digest
+        snapshot = self.__class__.__new__(self.__class__)
+        snapshot.__dict__.update(self.__dict__)
+        snapshot._frozen = view
+        snapshot._entries_digest = memo
+        return snapshot
+
+    def write(self, outfile, *args, **kwargs):
+        if self._frozen is None:
+            return self.snapshot().write(outfile, *args, **kwargs)
+        return super(ConcurrentFeedMixin, self).write(outfile, *args, **kwargs)
+
+    def fingerprint(self):
+        if self._frozen is None:
+            return self.snapshot().fingerprint()
+        return super(ConcurrentFeedMixin, self).fingerprint()
+
+    # Appending
+
+    def _check_mutable(self):
+        if self._frozen is not None:
+            raise TypeError('Feed snapshots are read-only.')
+
+    def _append(self, entry):
+        # Must be called with the lock held.
+        tail = self._tail
+        tail.append(entry)
+        if len(tail) >= self.chunk_size:
+            self._chunks.append(tuple(tail))
+            self._tail = []
+
+    def append(self, entry):
+        self._check_mutable()
+        with self._lock:
+            self._append(entry)
+
+    def extend(self, entries):
+        self._check_mutable()
+        entries = list(entries)
+        with self._lock:
+            for entry in entries:
+                self._append(entry)
+
+    def __iadd__(self, entries):
+        self.extend(entries)
+        return self
+
+    # Reading
+
+    def __iter__(self):
+        chunks, count, tail = self._view()
+        return chain(chain.from_iterable(islice(chunks, count)), tail)
+
+    def __len__(self):
+        chunks, count, tail = self._view()
+        return count * self.chunk_size + len(tail)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        chunks, count, tail = self._view()
+        size = count * self.chunk_size + len(tail)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError('feed index out of range')
+        chunk, offset = divmod(index, self.chunk_size)
+        return chunks[chunk][offset] if chunk < count else tail[offset]
+
+    def __getslice__(self, start, stop):
+        return list(self)[start:stop]
+
+    def __contains__(self, entry):
+        return entry in list(self)
+
+    def __reversed__(self):
+        return reversed(list(self))
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def index(self, *args):
+        return list(self).index(*args)
+
+    def count(self, entry):
+        return list(self).count(entry)
+
+    # Pickling
+
+    def __reduce_ex__(self, protocol):
+        # The default would restore the entries into the list itself.
+        return copy_reg.__newobj__, (self.__class__,), self.__getstate__()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in ('_lock', '_chunks', '_tail', '_frozen',
+                    '_entries_digest'):
+            del state[key]
+        state['_entries'] = list(self)
+        return state
+
+    def __setstate__(self, state):
+        entries = state.pop('_entries')
+        self.__dict__.update(state)
+        self.extend(entries)
+
+
+def _rewriting(name):
+    "Returns a method doing list method name on a copy of the entries."
+    def method(self, *args, **kwargs):
+        self._check_mutable()
+        with self._lock:
+            entries = list(chain(chain.from_iterable(self._chunks),
+                                 self._tail))
+            result = getattr(entries, name)(*args, **kwargs)
+            # New lists, so existing snapshots keep theirs.
+            self._chunks, self._tail = [], []
+            for entry in entries:
+                self._append(entry)
+            self._entries_digest = [(0, '')]
+        return result
+    method.__name__ = name
+    return method
+
+for _name in ('__setitem__', '__delitem__', '__setslice__', '__delslice__',
+              'insert', 'pop', 'remove', 'reverse', 'sort'):
+    setattr(ConcurrentFeedMixin, _name, _rewriting(_name))
+del _name
+
+
+class ConcurrentRss201rev2Feed(ConcurrentFeedMixin, Rss201rev2Feed):
+    pass
+
+
+class ConcurrentAtom1Feed(ConcurrentFeedMixin, Atom1Feed):
+    pass
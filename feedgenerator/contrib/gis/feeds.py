@@ -7,8 +7,12 @@ Other Fixes:
     - ducktype the polygon object so we can create a generalized version
 Modifications:
     - added flag to GeoFeedMixin to toggle the order of latitude/longitude.
+    - coordinates are formatted from flat arrays, with configurable
+      precision and optional simplification of lines and polygons.
 """
 from feedgenerator.generator import Atom1Feed, Rss201rev2Feed
+from feedgenerator.contrib.gis.geometry import (flatten, format_coords,
+    simplify, swap_pairs)
 
 class GeoFeedMixin(object):
     """
@@ -19,15 +23,27 @@ class GeoFeedMixin(object):
     is_input_latitude_first = False
     " If latitude is the first entry in coords, otherwise longitude is. "
 
-    def georss_coords(self, coords):
+    coords_precision = 6
+    " Number of decimals of the coordinates in GeoRSS elements. "
+
+    simplify_tolerance = None
+    " If set, lines and polygons are simplified to within this distance. "
+
+    def georss_coords(self, coords, simplify_line=False):
         """
         In GeoRSS coordinate pairs are ordered by lat/lon and separated by
-        a single white space.  Given a tuple of coordinates, this will return
-        a unicode GeoRSS representation.
+        a single white space.  Given a tuple of coordinates, or a flat
+        array of them, this will return a unicode GeoRSS representation.
+
+        If simplify_line is true and simplify_tolerance is set, the
+        coordinates are simplified first.
         """
-        if self.is_input_latitude_first:
-            coords = [(coord[1], coord[0]) for coord in coords]
-        return u' '.join([u'%f %f' % (coord[1], coord[0]) for coord in coords])
+        flat = flatten(coords)
+        if simplify_line and self.simplify_tolerance:
+            flat = simplify(flat, self.simplify_tolerance)
+        if not self.is_input_latitude_first:
+            flat = swap_pairs(flat)
+        return format_coords(flat, self.coords_precision)
 
     def add_georss_point(self, handler, coords, w3c_geo=False):
         """
@@ -39,8 +55,8 @@ class GeoFeedMixin(object):
             coords = (coords[1], coords[0])
         if w3c_geo:
             lon, lat = coords[:2]
-            handler.addQuickElement(u'geo:lat', u'%f' % lat)
-            handler.addQuickElement(u'geo:lon', u'%f' % lon)
+            handler.addQuickElement(u'geo:lat', format_coords((lat,), self.coords_precision))
+            handler.addQuickElement(u'geo:lon', format_coords((lon,), self.coords_precision))
         else:
             handler.addQuickElement(u'georss:point', self.georss_coords((coords,)))
 
@@ -84,13 +100,13 @@ class GeoFeedMixin(object):
                     # For formatting consistent w/the GeoRSS simple standard:
                     # http://georss.org/1.0#simple
                     if gtype in ('linestring', 'linearring'):
-                        handler.addQuickElement(u'georss:line', self.georss_coords(geom.coords))
+                        handler.addQuickElement(u'georss:line', self.georss_coords(geom.coords, True))
                     elif gtype in ('polygon',):
                         # Only support the exterior ring.
                         if hasattr(geom, '__getitem__'):
-                            handler.addQuickElement(u'georss:polygon', self.georss_coords(geom[0].coords))
+                            handler.addQuickElement(u'georss:polygon', self.georss_coords(geom[0].coords, True))
                         else:
-                            handler.addQuickElement(u'georss:polygon', self.georss_coords(geom.coords[0]))
+                            handler.addQuickElement(u'georss:polygon', self.georss_coords(geom.coords[0], True))
                     else:
                         raise ValueError('Geometry type "%s" not supported.' % geom.geom_type)
 
@@ -110,6 +126,15 @@ class GeoRSSFeed(Rss201rev2Feed, GeoFeedMixin):
         self.add_georss_element(handler, self.meta)
 
 class GeoAtom1Feed(Atom1Feed, GeoFeedMixin):
+    # Rendered by add_georss_element() instead.
+    supported_root_elements = dict(Atom1Feed.supported_root_elements,
+                                   geometry='add_no_element')
+    supported_entry_elements = dict(Atom1Feed.supported_entry_elements,
+                                    geometry='add_no_element')
+
+    def add_no_element(self, handler, key, value):
+        pass
+
     def root_attributes(self):
         attrs = super(GeoAtom1Feed, self).root_attributes()
         attrs[u'xmlns:georss'] = u'http://www.georss.org/georss'
@@ -121,7 +146,7 @@ class GeoAtom1Feed(Atom1Feed, GeoFeedMixin):
 
     def add_root_elements(self, handler):
         super(GeoAtom1Feed, self).add_root_elements(handler)
-        self.add_georss_element(handler, self.feed)
+        self.add_georss_element(handler, self.meta)
 
 class W3CGeoFeed(Rss201rev2Feed, GeoFeedMixin):
     def rss_attributes(self):
@@ -135,4 +160,4 @@ class W3CGeoFeed(Rss201rev2Feed, GeoFeedMixin):
 
     def add_root_elements(self, handler):
         super(W3CGeoFeed, self).add_root_elements(handler)
-        self.add_georss_element(handler, self.feed, w3c_geo=True)
+        self.add_georss_element(handler, self.meta, w3c_geo=True)
@@ -3,37 +3,188 @@ Helper class for defing geometries.  Adheres to behavior defined in
 the add_georss_element method of the GeoFeedMixin class.
 
 Code ported from webhelpers.
+
+The functions below work on flat coordinate arrays, ``array('d')`` objects
+holding ``X0, Y0, X1, Y1, ...``, which avoid one tuple and two float objects
+per coordinate pair.
 """
+import json
+import re
+from array import array
+from itertools import chain, imap
 
 
 SUPPORTED_GEO_TYPES = ('point', 'linestring', 'linearring', 'polygon')
+GEOJSON_TYPES = {'Point': 'point', 'LineString': 'linestring',
+                 'Polygon': 'polygon'}
+WKT_RE = re.compile(r'^\s*(point|linestring|linearring|polygon)\s*\((.*)\)\s*$',
+                    re.IGNORECASE | re.DOTALL)
+WKT_RING_RE = re.compile(r'\(([^()]*)\)')
+NUMBER_RE = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+
+def flatten(coords):
+    """
+    Returns coords as a flat array('d'). Accepts flat arrays (returned as
+    they are), sequences of coordinate pairs and NumPy arrays of them.
+    """
+    if isinstance(coords, array) and coords.typecode == 'd':
+        return coords
+    if hasattr(coords, 'ravel'):
+        # A NumPy array; copies its buffer instead of its items.
+        return array('d', coords.astype('d').ravel().tostring())
+    return array('d', chain.from_iterable(coords))
+
+
+def swap_pairs(flat):
+    "Returns a copy of the flat array with the items of every pair swapped."
+    swapped = array('d', flat)
+    swapped[::2] = flat[1::2]
+    swapped[1::2] = flat[::2]
+    return swapped
+
+
+def simplify(flat, tolerance):
+    """
+    Simplifies the line in the flat array with the Douglas-Peucker
+    algorithm: drops the points closer than tolerance to the line through
+    the points kept around them. The first and last points are always kept.
+    """
+    count = len(flat) // 2
+    if count < 3 or not tolerance:
+        return flat
+    keep = bytearray(count)
+    keep[0] = keep[-1] = 1
+    tolerance_squared = tolerance * tolerance
+    stack = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        x0, y0 = flat[2 * first], flat[2 * first + 1]
+        dx, dy = flat[2 * last] - x0, flat[2 * last + 1] - y0
+        length_squared = dx * dx + dy * dy
+        max_distance, index = -1.0, None
+        for i in xrange(first + 1, last):
+            px, py = flat[2 * i] - x0, flat[2 * i + 1] - y0
+            if length_squared:
+                # Squared distance from the line, times length_squared.
+                cross = px * dy - py * dx
+                distance = cross * cross / length_squared
+            else:
+                distance = px * px + py * py
+            if distance > max_distance:
+                max_distance, index = distance, i
+        if max_distance > tolerance_squared:
+            keep[index] = 1
+            stack.append((first, index))
+            stack.append((index, last))
+    return array('d', chain.from_iterable(
+        flat[2 * i:2 * i + 2] for i in xrange(count) if keep[i]))
+
+
+def format_coords(flat, precision=6):
+    """
+    Returns the numbers of the flat array formatted with precision decimals
+    and separated by single spaces.
+    """
+    return (u' '.join([u'%%.%df' % precision] * len(flat))) % tuple(flat)
+
+
+def parse_coords(coords):
+    """
+    Returns the coordinates of a point, line or ring as a flat array. Besides
+    what flatten() accepts, coords may be a single ``(X, Y)`` pair or a
+    string of whitespace separated numbers: ``"X0 Y0  X1 Y1 ..."``.
+    """
+    if isinstance(coords, basestring):
+        return array('d', imap(float, coords.split()))
+    if (not isinstance(coords, array) and len(coords)
+            and isinstance(coords[0], (int, long, float))):
+        return array('d', coords)
+    return flatten(coords)
 
 
 class Geometry(object):
     """ A basic geometry class for ``GeoFeedMixin``.
 
-    Instances have two public attributes:
+    Instances have three public attributes:
 
     .. attribute:: geom_type
 
        "point", "linestring", "linearring", "polygon"
 
-    .. attribute:: coords
+    .. attribute:: flat
+
+       The coordinates as a flat ``array('d')``: ``X0, Y0, X1, Y1, ...``.
+       For **polygon**, those of the exterior ring.
+
+    .. attribute:: rings
 
-       For **point**, a tuple or list of two floats: ``(X, Y)``.
+       For **polygon**, a list of flat arrays, one per ring, starting with the
+       exterior ring; only that one is used because the Geo classes support
+       only the exterior ring. For other types, ``[flat]``.
 
-       For **linestring** or **linearring**, a string: ``"X0 Y0  X1 Y1 ..."``.
+    ``coords`` returns ``flat`` for a **point**, **linestring** or
+    **linearring** and ``rings`` for a **polygon**.
 
-       For **polygon**, a list of strings: ``["X0 Y0  X1 Y1 ...", "...", ]``.
-       Only the first element is used because the Geo classes support only the
-       exterior ring.
+    The constructor takes the coordinates of a **point**, **linestring** or
+    **linearring** as a pair ``(X, Y)``, a sequence of pairs, a flat array or
+    a string ``"X0 Y0  X1 Y1 ..."``, and those of a **polygon** as a list of
+    such rings. Use ``from_wkt()`` and ``from_geojson()`` to parse other
+    formats.
 
-    The constructor does not check its argument types.
-      
     This class was created based on the interface expected by
     ``GeoFeedMixin.add_georss_element()``.
     """
     def __init__(self, geom_type, coords):
         assert geom_type in SUPPORTED_GEO_TYPES
         self.geom_type = geom_type
-        self.coords = coords
+        if geom_type == 'polygon':
+            self.rings = [parse_coords(ring) for ring in coords]
+            self.flat = self.rings[0]
+        else:
+            self.flat = parse_coords(coords)
+            self.rings = [self.flat]
+
+    @property
+    def coords(self):
+        if self.geom_type == 'polygon':
+            return self.rings
+        return self.flat
+
+    @classmethod
+    def from_wkt(cls, wkt):
+        """
+        Parses a Well-Known Text POINT, LINESTRING, LINEARRING or POLYGON.
+        """
+        match = WKT_RE.match(wkt)
+        if match is None:
+            raise ValueError('Invalid or unsupported WKT %r.' % wkt[:40])
+        geom_type, body = match.group(1).lower(), match.group(2)
+        rings = [array('d', imap(float, NUMBER_RE.findall(ring)))
+                 for ring in WKT_RING_RE.findall(body)]
+        if geom_type == 'polygon':
+            if not rings:
+                raise ValueError('Invalid WKT polygon %r.' % wkt[:40])
+            return cls(geom_type, rings)
+        return cls(geom_type, array('d', imap(float, NUMBER_RE.findall(body))))
+
+    @classmethod
+    def from_geojson(cls, geojson):
+        """
+        Builds a geometry from a GeoJSON Point, LineString or Polygon, given
+        as a dict or as a JSON string.
+        """
+        if isinstance(geojson, basestring):
+            geojson = json.loads(geojson)
+        geom_type = GEOJSON_TYPES.get(geojson.get('type'))
+        if geom_type is None:
+            raise ValueError('Unsupported GeoJSON type %r.'
+                             % geojson.get('type'))
+        coords = geojson['coordinates']
+        if geom_type == 'point':
+            return cls(geom_type, array('d', coords[:2]))
+        if geom_type == 'polygon':
+            return cls(geom_type, [array('d', chain.from_iterable(
+                position[:2] for position in ring)) for ring in coords])
+        return cls(geom_type, array('d', chain.from_iterable(
+            position[:2] for position in coords)))
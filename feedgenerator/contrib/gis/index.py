@@ -0,0 +1,169 @@
+"""
+A spatial index for building regional feeds from one pool of geotagged
+entries.
+
+Sample usage:
+
+>>> from feedgenerator.contrib.gis.index import GridIndex
+>>> index = GridIndex.from_feed(all_entries_feed, cell_size=0.5)
+>>> city = GeoRSSFeed(u'Oakland', u'http://example.org/oakland', u'...')
+>>> index.fill(city, (-122.35, 37.70, -122.10, 37.89))
+
+Coordinates are taken in the order the entries give them (X, Y), and boxes
+are (X0, Y0, X1, Y1) in the same order.
+"""
+from itertools import chain
+from feedgenerator.contrib.gis.geometry import flatten
+
+
+def bounds(geom):
+    """
+    Returns the bounding box (X0, Y0, X1, Y1) of an entry's geometry, which
+    may be anything GeoFeedMixin.add_georss_element() accepts.
+    """
+    if isinstance(geom, (list, tuple)):
+        if isinstance(geom[0], (list, tuple)):
+            # Box: ( (X0, Y0), (X1, Y1) )
+            flat = flatten(geom)
+        else:
+            # Point: (X, Y) or box: (X0, Y0, X1, Y1)
+            flat = geom
+    else:
+        flat = getattr(geom, 'flat', None)
+        if flat is None:
+            coords = geom.coords
+            if str(geom.geom_type).lower() == 'point':
+                coords = (coords,)
+            elif str(geom.geom_type).lower() == 'polygon':
+                coords = coords[0]
+            flat = flatten(coords)
+    xs, ys = flat[::2], flat[1::2]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+class BoundingBox(object):
+    "A bounding box that grows to include the boxes added to it."
+    def __init__(self):
+        self.box = None
+
+    def add(self, box):
+        if self.box is None:
+            self.box = box
+        else:
+            x0, y0, x1, y1 = self.box
+            self.box = (min(x0, box[0]), min(y0, box[1]),
+                        max(x1, box[2]), max(y1, box[3]))
+
+
+class GridIndex(object):
+    """
+    A uniform grid over the bounding boxes of entries' geometries. Each
+    entry is filed under every cell its box overlaps, so a box query only
+    looks at the entries in the cells the box overlaps.
+
+    cell_size should be of the order of the smallest regions queried.
+    Entries without a geometry are not indexed. Queries only visit occupied
+    cells, so boxes much larger than cell_size stay cheap.
+
+    Entries whose boxes overlap more than max_cells cells (e.g. a route
+    across a continent) are kept in one list of large entries instead,
+    which every query checks.
+    """
+    max_cells = 64
+
+    def __init__(self, cell_size=1.0):
+        self.cell_size = float(cell_size)
+        self.cells = {}
+        self.large = []
+        self.entries = []
+        self.bounds = []
+        # The range of the occupied cells, as _cell_range() returns it.
+        self.extent = None
+
+    @classmethod
+    def from_feed(cls, feed, cell_size=1.0):
+        "Returns an index of the (prepared) entries of feed."
+        index = cls(cell_size)
+        for entry in feed:
+            index.add(entry)
+        return index
+
+    def _cell_range(self, box):
+        size = self.cell_size
+        return (int(box[0] // size), int(box[1] // size),
+                int(box[2] // size), int(box[3] // size))
+
+    def add(self, entry):
+        geom = entry.get('geometry')
+        if geom is None:
+            return
+        box = bounds(geom)
+        position = len(self.entries)
+        self.entries.append(entry)
+        self.bounds.append(box)
+        i0, j0, i1, j1 = cell_range = self._cell_range(box)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > self.max_cells:
+            self.large.append(position)
+            return
+        if self.extent is None:
+            self.extent = cell_range
+        else:
+            ei0, ej0, ei1, ej1 = self.extent
+            self.extent = (min(ei0, i0), min(ej0, j0),
+                           max(ei1, i1), max(ej1, j1))
+        cells = self.cells
+        for i in xrange(i0, i1 + 1):
+            for j in xrange(j0, j1 + 1):
+                cells.setdefault((i, j), []).append(position)
+
+    def query(self, box):
+        """
+        Returns the positions of the entries whose bounding boxes intersect
+        box, in the order they were added.
+        """
+        x0, y0, x1, y1 = box
+        bounds, found = self.bounds, set()
+        for positions in chain([self.large], self._candidates(box)):
+            for position in positions:
+                if position in found:
+                    continue
+                bx0, by0, bx1, by1 = bounds[position]
+                if bx0 <= x1 and x0 <= bx1 and by0 <= y1 and y0 <= by1:
+                    found.add(position)
+        return sorted(found)
+
+    def _candidates(self, box):
+        "Returns the lists of positions in the occupied cells box overlaps."
+        if self.extent is None:
+            return ()
+        i0, j0, i1, j1 = self._cell_range(box)
+        ei0, ej0, ei1, ej1 = self.extent
+        i0, j0, i1, j1 = max(i0, ei0), max(j0, ej0), min(i1, ei1), min(j1, ej1)
+        if i0 > i1 or j0 > j1:
+            return ()
+        cells = self.cells
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > len(cells):
+            # Fewer cells are occupied than the box covers.
+            return (positions for (i, j), positions in cells.iteritems()
+                    if i0 <= i <= i1 and j0 <= j <= j1)
+        return (cells.get((i, j), ()) for i in xrange(i0, i1 + 1)
+                for j in xrange(j0, j1 + 1))
+
+    def entries_in(self, box):
+        "Returns the entries whose bounding boxes intersect box."
+        return [self.entries[position] for position in self.query(box)]
+
+    def fill(self, feed, box):
+        """
+        Adds the entries intersecting box to feed and sets the feed's
+        geometry to the bounding box of their geometries, which GeoRSS feeds
+        render as georss:box. Returns the number of entries added.
+        """
+        bbox = BoundingBox()
+        positions = self.query(box)
+        for position in positions:
+            bbox.add(self.bounds[position])
+        feed.extend(self.entries[position] for position in positions)
+        if bbox.box is not None:
+            feed.meta['geometry'] = bbox.box
+        return len(positions)
@@ -0,0 +1,83 @@
+"""
+Delta feeds as in RFC 3229 with the "feed" instance manipulation
+(http://bobwyman.pubsub.com/main/2004/09/using_rfc3229_w.html).
+
+A client that sends "A-IM: feed" and the ETag of the version it has in
+If-None-Match is sent only the entries added or changed since, with status
+"226 IM Used". FeedApplication does this when given a FeedHistory:
+
+>>> from feedgenerator.delta import FeedHistory
+>>> application = FeedApplication(feed, history=FeedHistory())
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from feedgenerator.generator import canonical_repr
+
+
+def entry_id(entry):
+    "Returns the identity of an Atom or RSS entry."
+    for key in ('id', 'unique_id', 'link'):
+        if entry.get(key):
+            return entry[key]
+    return canonical_repr(entry)
+
+
+def entry_digest(entry):
+    return hashlib.sha1(canonical_repr(entry).encode('utf-8')).digest()[:8]
+
+
+class FeedHistory(object):
+    """
+    Remembers the last size versions of a feed by ETag, each as a mapping
+    of entry ids to short digests of the entries. Instances can be shared
+    between threads.
+    """
+    def __init__(self, size=16):
+        self.size = size
+        self.versions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, feed, etag):
+        "Records the entries of feed as the version with the given ETag."
+        with self._lock:
+            if etag in self.versions:
+                return
+        # Digested without the lock; versions are not changed once recorded.
+        version = dict(
+            (entry_id(entry), entry_digest(entry)) for entry in feed)
+        with self._lock:
+            self.versions[etag] = version
+            while len(self.versions) > self.size:
+                self.versions.popitem(last=False)
+
+    def delta(self, feed, etag):
+        """
+        Returns the entries of feed that were added or changed since the
+        version with the given ETag, or None if that version is unknown.
+        """
+        with self._lock:
+            version = self.versions.get(etag)
+        if version is None:
+            return None
+        return [entry for entry in feed
+                if version.get(entry_id(entry)) != entry_digest(entry)]
+
+
+def accepts_feed_delta(environ):
+    "Whether the request's A-IM header asks for the feed manipulation."
+    header = environ.get('HTTP_A_IM', '')
+    return 'feed' in [im.split(';')[0].strip().lower()
+                      for im in header.split(',')]
+
+
+def delta_feed(feed, history, etag):
+    """
+    Returns a feed like feed holding only the entries added or changed
+    since the version with the given ETag, or None if history does not know
+    that version.
+    """
+    entries = history.delta(feed, etag)
+    if entries is None:
+        return None
+    return feed.with_entries(entries)
@@ -0,0 +1,124 @@
+"""
+Rendering many feeds that share entries, such as per-tag, per-author and
+per-section feeds of the same articles, in one pass over the entries.
+
+Sample usage:
+
+>>> from feedgenerator.fanout import FanOut
+>>> fan_out = FanOut(index=lambda entry: [category['term'] for category
+...                                       in entry.get('categories', ())])
+>>> fan_out.add('python', Atom1Feed(title=u'Python'), key=u'python')
+>>> fan_out.add('long', Atom1Feed(title=u'Long reads'),
+...             predicate=lambda entry: len(entry['content']['text']) > 8000)
+>>> fan_out.write(entries, {'python': python_fp, 'long': long_fp})
+
+Each entry is rendered once per kind of feed that includes it (feeds with
+equal render_key()s), and the bytes are copied into every such feed. The
+output of each feed is the same as that of its own render with the entries
+it includes.
+"""
+from StringIO import StringIO
+from feedgenerator.utils.writers import to_file
+
+
+class _NullFile(object):
+    def write(self, data):
+        pass
+
+
+class FanOut(object):
+    """
+    Feed definitions sharing one pool of prepared entries.
+
+    index -- callable(entry) returning the keys an entry is filed under, for
+             feeds selected by key
+    encoding -- the encoding to render the feeds in
+    """
+    def __init__(self, index=None, encoding='utf-8'):
+        self.index = index
+        self.encoding = encoding
+        self.feeds = {}
+        self._names_by_key = {}
+        self._predicates = []
+
+    def add(self, name, feed, predicate=None, key=None):
+        """
+        Adds the feed definition name. The output has the class, meta data
+        and settings of feed (whose entries are ignored), and holds either
+        the entries predicate(entry) is true for or those filed under key.
+        """
+        if (predicate is None) == (key is None):
+            raise ValueError('Give either a predicate or a key.')
+        if key is not None and self.index is None:
+            raise ValueError('Selecting entries by key needs an index.')
+        if name in self.feeds:
+            raise ValueError('There already is a feed named %r.' % (name,))
+        self.feeds[name] = feed
+        if key is not None:
+            self._names_by_key.setdefault(key, []).append(name)
+        else:
+            self._predicates.append((name, predicate))
+
+    def select(self, entries):
+        """
+        Makes one pass over entries and returns a dict mapping each feed's
+        name to a list of (entry, fragment) pairs of the entries it holds,
+        in order. fragment is the entry as rendered by entry_fragment().
+        """
+        index, names_by_key = self.index, self._names_by_key
+        selected = dict((name, []) for name in self.feeds)
+        kinds = dict((name, feed.render_key())
+                     for name, feed in self.feeds.iteritems())
+        handlers = {}
+        for entry in entries:
+            names = set(name for name, predicate in self._predicates
+                        if predicate(entry))
+            if index is not None:
+                for key in index(entry):
+                    names.update(names_by_key.get(key, ()))
+            fragments = {}
+            for name in names:
+                feed = self.feeds[name]
+                kind = kinds[name]
+                fragment = fragments.get(kind)
+                if fragment is None:
+                    handler = handlers.get(kind)
+                    if handler is None:
+                        handler = feed.get_handler(_NullFile(), self.encoding)
+                        handler.startDocument()
+                        handlers[kind] = handler
+                    fragment = feed.entry_fragment(handler, entry)
+                    fragments[kind] = fragment
+                selected[name].append((entry, fragment))
+        return selected
+
+    def write(self, entries, outfiles):
+        """
+        Renders every feed with the entries from entries it holds to
+        outfiles[name] (a file-like object or a list of sinks, see
+        SyndicationFeed.write()), and returns a dict of the numbers of entries
+        written by name.
+        """
+        counts = {}
+        for name, selected in self.select(entries).iteritems():
+            # The entries are there for the root elements derived from them.
+            head = self.feeds[name].with_entries(
+                [entry for entry, fragment in selected])
+            handler = head.get_handler(to_file(outfiles[name]),
+                                       self.encoding)
+            handler.startDocument()
+            head.start_root_element(handler)
+            head.add_root_elements(handler)
+            for entry, fragment in selected:
+                head.write_fragment(handler, fragment)
+            head.end_root_element(handler)
+            handler.endDocument()
+            counts[name] = len(selected)
+        return counts
+
+    def write_strings(self, entries):
+        "Returns a dict of the renders of all feeds as strings by name."
+        outfiles = dict((name, StringIO()) for name in self.feeds)
+        self.write(entries, outfiles)
+        return dict((name, outfile.getvalue())
+                    for name, outfile in outfiles.iteritems())
@@ -28,11 +28,12 @@ CHANGES:
    - from webhelpers: add published property for entries to atom feed
 """
 
+# Modules only some features need (uuid, urlparse, hashlib, the XML and JSON
+# generators) are imported where they are used, so importing the package
+# stays cheap for short-lived processes.
 import datetime
-import json
-import urlparse
-import uuid
-from feedgenerator.utils.xmlutils import SimplerXMLGenerator
+from itertools import islice, izip
+from feedgenerator.utils.writers import DEFAULT_BUFFER_SIZE
 from feedgenerator.utils.encoding import force_unicode, iri_to_uri
 from feedgenerator.utils import datetime_safe
 from feedgenerator.utils.timezone import is_aware
@@ -69,14 +70,20 @@ def rfc3339_date(date):
         return date.strftime('%Y-%m-%dT%H:%M:%SZ')
 
 def new_random_urn():
+    import uuid
     return unicode(uuid.uuid4().urn)
 
+def atom_date(date):
+    "Formats a naive datetime in UTC as Atom1Feed writes dates."
+    return date.isoformat() + u'Z'
+
 def get_tag_uri(url, date):
     """
     Creates a TagURI.
 
     See http://diveintomark.org/archives/2004/05/28/howto-atom-id
     """
+    import urlparse
     bits = urlparse.urlparse(url)
     d = ''
     if date is not None:
@@ -89,6 +96,56 @@ def minimized(dictionary):
                 for key, value in dictionary.iteritems()
                 if value is not None)
 
+def byte_length(value):
+    """
+    Returns an enclosure length as an int, or None if it is empty or not a
+    number.
+    """
+    try:
+        length = int(value)
+    except (TypeError, ValueError):
+        return None
+    return length if length >= 0 else None
+
+def canonical_repr(value):
+    """
+    Returns a representation of value that does not depend on the order of
+    the dicts in it or on the process, for fingerprinting. Raises TypeError
+    for values that have no such representation.
+    """
+    if isinstance(value, (datetime.date, datetime.time)):
+        # With the UTC offset of aware values, whatever their tzinfo.
+        return u'%s(%s)' % (value.__class__.__name__, value.isoformat())
+    if isinstance(value, dict):
+        return u'{%s}' % u','.join(sorted(
+            u'%s:%s' % (canonical_repr(key), canonical_repr(item))
+            for key, item in value.iteritems()))
+    if isinstance(value, (list, tuple)):
+        return u'[%s]' % u','.join(map(canonical_repr, value))
+    if hasattr(value, '__dict__'):
+        return u'%s%s' % (value.__class__.__name__, canonical_repr(vars(value)))
+    text = repr(value).decode('ascii')
+    if u' at 0x' in text:
+        raise TypeError('%s has no stable representation.' % text)
+    return text
+
+def ordered_items(dictionary, order):
+    """
+    Returns the items of dictionary with the keys in order first, in that
+    order, followed by any others sorted by key.
+    """
+    items = [(key, dictionary[key]) for key in order if key in dictionary]
+    if len(items) < len(dictionary):
+        items.extend(sorted((key, value)
+                            for key, value in dictionary.iteritems()
+                            if key not in order))
+    return items
+
+def ordered_attributes(attributes, order):
+    "Returns attributes as a mapping that iterates in ordered_items() order."
+    from collections import OrderedDict
+    return OrderedDict(ordered_items(attributes, order))
+
 def partition(dictionary, keys1, keys2):
     partition1 = dict((key, value)
                       for key, value in dictionary.iteritems()
@@ -103,9 +160,91 @@ class ConflictingDefinitionsException(ValueError):
     pass
 
 
+class _Untimed(object):
+    "The phase write_stream() runs each phase in when not timing them."
+    def __call__(self, name):
+        return self
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+_untimed = _Untimed()
+
+
 class SyndicationFeed(list):
     """Base class for all syndication feeds. Subclasses should provide write()"""
 
+    # Output is passed to the file-like object given to write() in blocks
+    # of this many bytes.
+    write_buffer_size = DEFAULT_BUFFER_SIZE
+
+    # A feedgenerator.utils.interning.InternPool to share the authors,
+    # categories and links of entries through, or None not to.
+    intern_pool = None
+
+    # Helpers that preparing and rendering call through the feed, so
+    # feedgenerator.stats.RenderStats can time them.
+    rfc2822_date = staticmethod(rfc2822_date)
+    rfc3339_date = staticmethod(rfc3339_date)
+    atom_date = staticmethod(atom_date)
+    iri_to_uri = staticmethod(iri_to_uri)
+
+    # Instance attributes that do not change how entries render, which
+    # render_key() leaves out.
+    render_key_ignored = ('meta', 'intern_pool', 'observers',
+                          'write_buffer_size')
+
+    # Instance attributes that hold run-time wiring rather than settings,
+    # which settings() leaves out.
+    settings_ignored = ('meta', 'intern_pool', 'observers')
+
+    @classmethod
+    def from_prepared(cls, meta, entries):
+        """
+        Returns a feed of this class holding meta and entries that were
+        already prepared by another instance (e.g. its meta and items),
+        without normalizing or validating them again.
+        """
+        feed = cls.__new__(cls)
+        feed.meta = meta
+        feed.extend(entries)
+        return feed
+
+    def with_entries(self, entries):
+        """
+        Returns a feed of the same class, meta data and settings holding the
+        given prepared entries instead of this feed's.
+        """
+        feed = self.from_prepared(self.meta, entries)
+        for key, value in self.__dict__.iteritems():
+            if key != '_entries_digest':
+                feed.__dict__.setdefault(key, value)
+        return feed
+
+    def copy(self):
+        """
+        Returns a feed of the same class, meta data and settings holding this
+        feed's entries as they are now. It shares what fingerprint()
+        remembers about them.
+        """
+        feed = self.with_entries(list(self))
+        feed._entries_digest = self.__dict__.setdefault('_entries_digest',
+                                                        [(0, '')])
+        return feed
+
+    def settings(self):
+        """
+        Returns the settings set on the instance (such as canonical or
+        coords_precision) as a dict, for restoring them on another instance
+        with feed.__dict__.update().
+        """
+        return dict((name, value) for name, value in self.__dict__.iteritems()
+                    if not name.startswith('_') and
+                    name not in self.settings_ignored)
+
     def __str__(self):
         return self.write_string()
 
@@ -142,22 +281,236 @@ class SyndicationFeed(list):
         """
         pass
 
-    def write(self, outfile, encoding=u'utf-8'):
+    def get_handler(self, outfile, encoding):
         """
-        Outputs the feed in the given encoding to outfile, which is a file-like
-        object. Subclasses should override this.
+        Return the handler write() renders through.
+        """
+        from feedgenerator.utils.xmlutils import SimplerXMLGenerator
+        return SimplerXMLGenerator(outfile, encoding, self.write_buffer_size)
+
+    def start_root_element(self, handler):
+        """
+        Open the root (i.e. feed/channel) element. Called from write().
+        Subclasses should override this.
+        """
+        raise NotImplementedError
+
+    def end_root_element(self, handler):
+        """
+        Close the root element opened by start_root_element().
         """
         raise NotImplementedError
 
-    def write_string(self, encoding=u'utf-8'):
+    def write_entries(self, handler, entries=None, max_bytes=None):
+        """
+        Writes entries (the feed's own by default) and returns how many it
+        wrote. With max_bytes, it stops before the first entry that would
+        make the output, including the end of the document, longer than
+        max_bytes bytes.
+        """
+        count = 0
+        for count in self.write_entries_steps(handler, entries, max_bytes):
+            pass
+        return count
+
+    def write_entries_steps(self, handler, entries=None, max_bytes=None):
+        """
+        Does what write_entries() does, yielding the number of entries
+        written so far after each entry.
+        """
+        if entries is None:
+            entries = self
+        count = 0
+        if max_bytes is None:
+            for entry in entries:
+                self.write_entry(handler, entry)
+                count += 1
+                yield count
+            return
+        for entry in entries:
+            handler.mark()
+            self.write_entry(handler, entry)
+            # Render the end of the document to measure it, and take it back.
+            handler.mark()
+            self.end_root_element(handler)
+            size = handler.tell()
+            handler.rollback()
+            if size > max_bytes:
+                handler.rollback()
+                break
+            handler.release()
+            count += 1
+            yield count
+
+    def write_entry(self, handler, entry):
+        handler.startElement(u"entry", self.entry_attributes(entry))
+        self.add_entry_elements(handler, entry)
+        handler.endElement(u"entry")
+
+    def render_key(self):
+        """
+        Returns a hashable key that is equal for feeds rendering every entry
+        the same: the feed's class and the settings (such as canonical or
+        coords_precision) set on the instance.
+        """
+        settings = []
+        for name, value in sorted(self.__dict__.iteritems()):
+            if name.startswith('_') or name in self.render_key_ignored:
+                continue
+            try:
+                hash(value)
+            except TypeError:
+                value = canonical_repr(value)
+            settings.append((name, value))
+        return self.__class__, tuple(settings)
+
+    def entry_fragment(self, handler, entry):
+        """
+        Returns entry rendered as in this feed, as a byte string that
+        write_fragment() can write into renders of other feeds with the
+        same render_key(). handler is one that get_handler() returned; it
+        is left as it was.
+        """
+        handler.mark()
+        self.write_entry(handler, entry)
+        fragment = handler.marked()
+        handler.rollback()
+        return fragment
+
+    def write_fragment(self, handler, fragment):
+        "Writes an entry rendered by entry_fragment() through handler."
+        handler.writer.write(fragment)
+
+    def write(self, outfile, encoding=u'utf-8', stats=None, max_bytes=None):
+        """
+        Outputs the feed in the given encoding to outfile, which is a file-like
+        object, and returns the number of entries written.
+
+        outfile can also be a list or tuple of sinks (file-like objects or
+        objects with an update() method, like hashlib digests), which all
+        get every chunk of the one render:
+
+        >>> digest = hashlib.sha256()
+        >>> feed.write([fp, gzip.GzipFile(fileobj=gz_fp, mode='wb'), digest])
+
+        If stats is a feedgenerator.stats.RenderStats instance, the render is
+        timed phase by phase and step by step and recorded on it.
+
+        With max_bytes, only as many entries are written as fit into that
+        many bytes of output, in one pass. The rest are left out, so
+        the newest entries should come first. The meta data is always
+        written, even if it alone exceeds max_bytes.
+        """
+        if stats is not None:
+            return stats.render(self, outfile, None, encoding, max_bytes)
+        return self.write_stream(outfile, None, encoding, max_bytes)
+
+    def write_stream(self, outfile, entries, encoding=u'utf-8',
+                     max_bytes=None, phase=_untimed):
+        """
+        Outputs the feed like write() does, but with entries, an iterable of
+        prepared entries, in place of its own. Root elements derived from
+        the entries (such as Atom's updated and RSS's lastBuildDate) are
+        still computed from the feed's own entries, so it should hold the
+        latest of them.
+
+        entries is consumed as it is rendered, so it can be a stream from a
+        file or database that never fits in memory. Returns the number of
+        entries written; outfile and max_bytes are as for write().
+
+        phase(name) returns the context manager each phase ("start",
+        "root_elements", "entries" and "end") runs in, for timing them.
         """
-        Returns the feed in the given encoding as a string.
+        count = 0
+        for count in self.write_stream_steps(outfile, entries, encoding,
+                                             max_bytes, phase):
+            pass
+        return count
+
+    def write_stream_steps(self, outfile, entries, encoding=u'utf-8',
+                           max_bytes=None, phase=_untimed):
+        """
+        Does what write_stream() does, yielding the number of entries
+        written so far after the root elements, after each entry and at the
+        end, so the caller can pass on what reached outfile meanwhile.
+        Phases include the time the caller takes between steps.
+        """
+        from feedgenerator.utils.writers import to_file
+        count = 0
+        with phase('start'):
+            handler = self.get_handler(to_file(outfile), encoding)
+            handler.startDocument()
+            self.start_root_element(handler)
+        with phase('root_elements'):
+            self.add_root_elements(handler)
+        yield count
+        with phase('entries'):
+            for count in self.write_entries_steps(handler, entries,
+                                                  max_bytes):
+                yield count
+        with phase('end'):
+            self.end_root_element(handler)
+            handler.endDocument()
+        yield count
+
+    def write_string(self, encoding=u'utf-8', max_bytes=None):
+        """
+        Returns the feed in the given encoding as a string, of at most
+        max_bytes bytes if given (see write()).
         """
         from StringIO import StringIO
         s = StringIO()
-        self.write(s, encoding)
+        self.write(s, encoding, max_bytes=max_bytes)
         return s.getvalue()
 
+    def fingerprint(self):
+        """
+        Returns a hex digest of the feed's class, render settings (those in
+        render_key()), meta data and entries. Feeds that would render the
+        same have the same fingerprint, in any process. Raises TypeError if
+        the feed holds values without a stable representation (see
+        canonical_repr()).
+
+        Digesting the entries costs about as much as rendering them, so the
+        digest is remembered and only extended by entries appended since:
+        asking again costs about as much as digesting the meta data. Changes
+        through the list methods are seen; after changing entries in place,
+        call changed().
+        """
+        import hashlib
+        cls, settings = self.render_key()
+        digest = hashlib.sha1(cls.__name__)
+        # Leaving out helpers replaced on the instance, e.g. by RenderStats.
+        digest.update(canonical_repr([setting for setting in settings
+                                      if not callable(setting[1])]
+                                     ).encode('utf-8'))
+        digest.update(canonical_repr(self.meta).encode('utf-8'))
+        digest.update(self._digest_entries())
+        return digest.hexdigest()
+
+    def _digest_entries(self):
+        import hashlib
+        # [(number of entries digested, digest)], shared with copies and
+        # snapshots of the feed, which hold the same entries or fewer.
+        memo = self.__dict__.setdefault('_entries_digest', [(0, '')])
+        count, digest = memo[0]
+        if count > len(self):
+            count, digest = 0, ''
+        for entry in islice(self, count, None):
+            digest = hashlib.sha1(
+                digest + canonical_repr(entry).encode('utf-8')).digest()
+            count += 1
+        if count > memo[0][0]:
+            memo[0] = count, digest
+        return digest
+
+    def changed(self):
+        """
+        Tells the feed its entries were changed in place (e.g. an entry's
+        title), which fingerprint() does not notice by itself.
+        """
+        self._entries_digest = [(0, '')]
+
     def latest_post_date(self):
         """
         Returns the latest entry's pubdate. If none of them have a pubdate,
@@ -173,6 +526,22 @@ class SyndicationFeed(list):
             return datetime.datetime.now()
 
 
+def _forgetting(name):
+    "Returns list method name, forgetting the digest of the entries."
+    def method(self, *args, **kwargs):
+        result = getattr(super(SyndicationFeed, self), name)(*args, **kwargs)
+        self._entries_digest = [(0, '')]
+        return result
+    method.__name__ = name
+    return method
+
+# Appending keeps the digest, which fingerprint() extends.
+for _name in ('insert', 'pop', 'remove', 'reverse', 'sort', '__setitem__',
+              '__delitem__', '__setslice__', '__delslice__', '__imul__'):
+    setattr(SyndicationFeed, _name, _forgetting(_name))
+del _name
+
+
 class Enclosure(object):
     "Represents an RSS enclosure"
     def __init__(self, url, length, mime_type):
@@ -211,6 +580,20 @@ class RssFeed(SyndicationFeed):
         })
         self.meta.update(kwargs)
 
+    # add_entry()'s arguments, in order, and how prepare_entry() normalizes
+    # them.
+    entry_fields = ('title', 'link', 'description', 'author_email',
+                    'author_name', 'author_link', 'pubdate', 'comments',
+                    'unique_id', 'enclosure', 'categories', 'entry_copyright',
+                    'ttl')
+    entry_required_fields = ('title', 'link', 'description')
+    entry_text_fields = ('title', 'description', 'author_email', 'author_name',
+                         'comments', 'unique_id', 'entry_copyright')
+    entry_uri_fields = ('link', 'author_link')
+    # Shared through intern_pool, if the feed has one.
+    entry_shared_fields = ('author_email', 'author_name', 'author_link',
+                           'categories')
+
     def add_entry(self, title, link, description, author_email=None,
         author_name=None, author_link=None, pubdate=None, comments=None,
         unique_id=None, enclosure=None, categories=(), entry_copyright=None,
@@ -220,37 +603,94 @@ class RssFeed(SyndicationFeed):
         objects except pubdate, which is a datetime.datetime object, and
         enclosure, which is an instance of the Enclosure class.
         """
-        to_unicode = lambda s: force_unicode(s, strings_only=True)
-        if categories:
-            categories = [to_unicode(c) for c in categories]
-        if ttl is not None:
-            # Force ints to unicode
-            ttl = force_unicode(ttl)
-        entry = minimized({
-            'title': to_unicode(title),
-            'link': iri_to_uri(link),
-            'description': to_unicode(description),
-            'author_email': to_unicode(author_email),
-            'author_name': to_unicode(author_name),
-            'author_link': iri_to_uri(author_link),
-            'pubdate': pubdate,
-            'comments': to_unicode(comments),
-            'unique_id': to_unicode(unique_id),
-            'enclosure': enclosure,
-            'categories': categories or (),
-            'entry_copyright': to_unicode(entry_copyright),
-            'ttl': ttl,
-        })
-        entry.update(kwargs)
-        self.append(entry)
+        self.append(self.prepare_entry(dict(kwargs,
+            title=title, link=link, description=description,
+            author_email=author_email, author_name=author_name,
+            author_link=author_link, pubdate=pubdate, comments=comments,
+            unique_id=unique_id, enclosure=enclosure, categories=categories,
+            entry_copyright=entry_copyright, ttl=ttl)))
+
+    def prepare_entry(self, entry):
+        """
+        Returns an entry normalized like add_entry() does from entry, a dict
+        of add_entry()'s arguments or a tuple of its positional arguments.
+        Other keys of the dict are kept as they are.
+        """
+        return self.prepare_entries((entry,))[0]
+
+    def prepare_entries(self, entries):
+        """
+        Returns a list of the given entries, each prepared as by
+        prepare_entry(), doing the lookups that takes once for all of them.
+        """
+        fields, required = self.entry_fields, self.entry_required_fields
+        text_fields, uri_fields = self.entry_text_fields, self.entry_uri_fields
+        to_unicode, to_uri = force_unicode, self.iri_to_uri
+        shared_fields = self.entry_shared_fields
+        pool = self.intern_pool
+        intern = pool.intern if pool is not None else None
+        prepared = []
+        append = prepared.append
+        for entry in entries:
+            if isinstance(entry, tuple):
+                entry = dict(izip(fields, entry))
+            else:
+                entry = dict(entry)
+            for key in required:
+                if key not in entry:
+                    raise TypeError('An entry needs a %s.' % key)
+            for key in text_fields:
+                value = entry.get(key)
+                if value is None:
+                    entry.pop(key, None)
+                elif not isinstance(value, unicode):
+                    entry[key] = to_unicode(value, strings_only=True)
+            for key in uri_fields:
+                value = entry.get(key)
+                if value is None:
+                    entry.pop(key, None)
+                else:
+                    entry[key] = to_uri(value)
+            if entry.get('pubdate', 0) is None:
+                del entry['pubdate']
+            if entry.get('enclosure', 0) is None:
+                del entry['enclosure']
+            categories = entry.get('categories')
+            if categories:
+                entry['categories'] = [
+                    category if isinstance(category, unicode)
+                    else to_unicode(category, strings_only=True)
+                    for category in categories]
+            else:
+                entry['categories'] = ()
+            ttl = entry.get('ttl')
+            if ttl is None:
+                entry.pop('ttl', None)
+            else:
+                # Force ints to unicode
+                entry['ttl'] = to_unicode(ttl)
+            if intern is not None:
+                for key in shared_fields:
+                    if key in entry:
+                        entry[key] = intern(entry[key])
+            append(entry)
+        return prepared
 
-    def write(self, outfile, encoding='utf-8'):
-        handler = SimplerXMLGenerator(outfile, encoding)
-        handler.startDocument()
+    def add_entries(self, *entries):
+        """
+        Bulk-adds entries, each a dict of add_entry()'s arguments or a tuple
+        of its positional arguments:
+
+        >>> feed.add_entries((u'Title', u'/link/', u'Description'),
+        ...                  {'title': u'Title', 'link': u'/link/', ...})
+        """
+        self.extend(self.prepare_entries(entries))
+
+    def start_root_element(self, handler):
         handler.startElement(u"rss", self.rss_attributes())
         handler.startElement(u"channel", self.root_attributes())
-        self.add_root_elements(handler)
-        self.write_entries(handler)
+
+    def end_root_element(self, handler):
         self.endChannelElement(handler)
         handler.endElement(u"rss")
 
@@ -258,12 +698,6 @@ class RssFeed(SyndicationFeed):
         return {u"version": self._version,
                 u"xmlns:atom": u"http://www.w3.org/2005/Atom"}
 
-    def write_entries(self, handler):
-        for entry in self:
-            handler.startElement(u'entry', self.entry_attributes(entry))
-            self.add_entry_elements(handler, entry)
-            handler.endElement(u"entry")
-
     def add_root_elements(self, handler):
         handler.addQuickElement(u"title", self.meta['title'])
         handler.addQuickElement(u"link", self.meta['link'])
@@ -277,7 +711,7 @@ class RssFeed(SyndicationFeed):
             handler.addQuickElement(u"category", cat)
         if self.meta.has_key('feed_copyright'):
             handler.addQuickElement(u"copyright", self.meta['feed_copyright'])
-        handler.addQuickElement(u"lastBuildDate", rfc2822_date(self.latest_post_date()).decode('utf-8'))
+        handler.addQuickElement(u"lastBuildDate", self.rfc2822_date(self.latest_post_date()).decode('utf-8'))
         if self.meta.has_key('ttl'):
             handler.addQuickElement(u"ttl", self.meta['ttl'])
 
@@ -315,7 +749,7 @@ class Rss201rev2Feed(RssFeed):
                 entry["author_name"],
                 {u"xmlns:dc": u"http://purl.org/dc/elements/1.1/"})
         if entry.has_key('pubdate'):
-            handler.addQuickElement(u"pubDate", rfc2822_date(entry['pubdate']).decode('utf-8'))
+            handler.addQuickElement(u"pubDate", self.rfc2822_date(entry['pubdate']).decode('utf-8'))
         if entry.has_key('comments'):
             handler.addQuickElement(u"comments", entry['comments'])
         if entry.has_key('unique_id'):
@@ -338,6 +772,62 @@ class Atom1Feed(SyndicationFeed):
     # Spec: http://atompub.org/2005/07/11/draft-ietf-atompub-format-10.html
     mime_type = 'application/atom+xml; charset=utf-8'
     ns = u"http://www.w3.org/2005/Atom"
+    # The names of the methods rendering the supported meta data and entry
+    # keys. Subclasses extend them with dict(Atom1Feed.supported_..., ...).
+    supported_root_elements = {
+        'id': 'add_element',
+        'title': 'add_element',
+        'updated': 'add_date_element',
+        'authors': 'add_plain_elements',
+        'links': 'add_self_closing_elements',
+        'categories': 'add_self_closing_elements',
+        'contributors': 'add_plain_elements',
+        'generator': 'add_text_construct_element',
+        'subtitle': 'add_element',
+        'icon': 'add_element',
+        'logo': 'add_element',
+        'rights': 'add_text_construct_element',
+    }
+    supported_entry_elements = {
+        'id': 'add_element',
+        'title': 'add_element',
+        'updated': 'add_date_element',
+        'published': 'add_date_element',
+        'summary': 'add_text_construct_element',
+        'content': 'add_text_construct_element',
+        'authors': 'add_plain_elements',
+        'links': 'add_self_closing_elements',
+        'categories': 'add_self_closing_elements',
+        'contributors': 'add_plain_elements',
+        'rights': 'add_text_construct_element',
+        'source': 'add_nested_element',
+    }
+    # Shared through intern_pool, if the feed has one. Add 'links' where
+    # entries have links in common.
+    entry_shared_fields = ('authors', 'contributors', 'categories')
+
+    # If true, elements and attributes are written in the orders below,
+    # which follow the schema in RFC 4287, so that equal feeds render to
+    # equal bytes. Keys missing from the orders come last, sorted.
+    canonical = False
+    root_element_order = ('authors', 'categories', 'contributors',
+                          'generator', 'icon', 'id', 'links', 'logo', 'rights',
+                          'subtitle', 'title', 'updated')
+    entry_element_order = ('authors', 'categories', 'content', 'contributors',
+                           'id', 'links', 'published', 'rights', 'source',
+                           'summary', 'title', 'updated')
+    # Of the elements of nested elements, by element name.
+    nested_element_orders = {
+        'author': ('name', 'uri', 'email'),
+        'contributor': ('name', 'uri', 'email'),
+        'source': root_element_order,
+    }
+    attribute_orders = {
+        'feed': ('xmlns', 'xml:lang'),
+        'link': ('href', 'rel', 'type', 'hreflang', 'title', 'length'),
+        'category': ('term', 'scheme', 'label'),
+        'generator': ('uri', 'version'),
+    }
 
     def __init__(self, entries=[], **kwargs):
         """Initializes an Atom feed.
@@ -357,34 +847,6 @@ class Atom1Feed(SyndicationFeed):
         logo -- an image that provides visual identification (optional)
         rights -- rights held in and over an entry or feed (optional)
         """
-        self.supported_root_elements = {
-            'id': self.add_element,
-            'title': self.add_element,
-            'updated': self.add_date_element,
-            'authors': self.add_plain_elements,
-            'links': self.add_self_closing_elements,
-            'categories': self.add_self_closing_elements,
-            'contributors': self.add_plain_elements,
-            'generator': self.add_text_construct_element,
-            'subtitle': self.add_element,
-            'icon': self.add_element,
-            'logo': self.add_element,
-            'rights': self.add_text_construct_element,
-        }
-        self.supported_entry_elements = {
-            'id': self.add_element,
-            'title': self.add_element,
-            'updated': self.add_date_element,
-            'published': self.add_date_element,
-            'summary': self.add_text_construct_element,
-            'content': self.add_text_construct_element,
-            'authors': self.add_plain_elements,
-            'links': self.add_self_closing_elements,
-            'categories': self.add_self_closing_elements,
-            'contributors': self.add_plain_elements,
-            'rights': self.add_text_construct_element,
-            'source': self.add_nested_element,
-        }
         kwargs = minimized(kwargs)
         for key in ('summary', 'content'):
             if kwargs.has_key(key) and not kwargs.get(key, {}).get('text'):
@@ -455,14 +917,18 @@ class Atom1Feed(SyndicationFeed):
             entry['authors'] = tuple(entry.get('authors', ()))
             entry['authors'] += ({'name': entry['author']},)
             del entry['author']
+        pool = self.intern_pool
+        if pool is not None:
+            for key in self.entry_shared_fields:
+                if key in entry:
+                    entry[key] = pool.intern(entry[key])
         return entry
 
-    def write(self, outfile, encoding='utf-8'):
-        handler = SimplerXMLGenerator(outfile, encoding)
-        handler.startDocument()
-        handler.startElement(u'feed', self.root_attributes())
-        self.add_root_elements(handler)
-        self.write_entries(handler)
+    def start_root_element(self, handler):
+        handler.startElement(u'feed', self.attributes(u'feed',
+                                                      self.root_attributes()))
+
+    def end_root_element(self, handler):
         handler.endElement(u"feed")
 
     def root_attributes(self):
@@ -478,20 +944,31 @@ class Atom1Feed(SyndicationFeed):
                 'contributors': 'contributor',
                 'categories': 'category'}.get(key, key)
 
+    def attributes(self, key, attributes):
+        "Returns the attributes to write for element key."
+        if self.canonical and len(attributes) > 1:
+            return ordered_attributes(attributes,
+                                      self.attribute_orders.get(key, ()))
+        return attributes
+
     def add_element(self, handler, key, content, attributes=None):
-        handler.addQuickElement(key, content, attributes or {})
+        handler.addQuickElement(key, content,
+                                self.attributes(key, attributes or {}))
 
     def add_nested_element(self, handler, key, elements=None, attributes=None):
         elements = elements if elements is not None else {}
         attributes = attributes if attributes is not None else {}
-        handler.startElement(key, attributes)
-        for subkey, value in elements.iteritems():
-            if subkey in self.supported_root_elements:
-                self.supported_root_elements[subkey](
-                    handler, self.map_key(subkey), value)
-            elif subkey in self.supported_entry_elements:
-                self.supported_entry_elements[subkey](
-                    handler, self.map_key(subkey), value)
+        handler.startElement(key, self.attributes(key, attributes))
+        if self.canonical:
+            elements = ordered_items(
+                elements, self.nested_element_orders.get(key, ()))
+        else:
+            elements = elements.iteritems()
+        for subkey, value in elements:
+            name = (self.supported_root_elements.get(subkey) or
+                    self.supported_entry_elements.get(subkey))
+            if name is not None:
+                getattr(self, name)(handler, self.map_key(subkey), value)
             else:
                 handler.addQuickElement(subkey, value)
         handler.endElement(key)
@@ -510,28 +987,132 @@ class Atom1Feed(SyndicationFeed):
         self.add_element(handler, key, content, attributes)
 
     def add_date_element(self, handler, key, content):
-        self.add_element(handler, key, content.isoformat() + 'Z')
+        self.add_element(handler, key, self.atom_date(content))
 
     def add_root_elements(self, handler):
-        for key, value in self.meta.iteritems():
-            self.supported_root_elements[key](
-                handler, self.map_key(key), value)
+        supported = self.supported_root_elements
+        if self.canonical:
+            items = ordered_items(self.meta, self.root_element_order)
+        else:
+            items = self.meta.iteritems()
+        for key, value in items:
+            getattr(self, supported[key])(handler, self.map_key(key), value)
         if not 'updated' in self.meta:
             handler.addQuickElement(
                 u'updated',
-                max([entry['updated'] for entry in self] \
-                    + [datetime.datetime.utcnow()]).isoformat() + u'Z')
-
-    def write_entries(self, handler):
-        for entry in self:
-            handler.startElement(u"entry", self.entry_attributes(entry))
-            self.add_entry_elements(handler, entry)
-            handler.endElement(u"entry")
+                self.atom_date(max([entry['updated'] for entry in self] \
+                                   + [datetime.datetime.utcnow()])))
 
     def add_entry_elements(self, handler, entry):
-        for key, value in entry.iteritems():
-            self.supported_entry_elements[key](
-                handler, self.map_key(key), value)
+        supported = self.supported_entry_elements
+        if self.canonical:
+            items = ordered_items(entry, self.entry_element_order)
+        else:
+            items = entry.iteritems()
+        for key, value in items:
+            getattr(self, supported[key])(handler, self.map_key(key), value)
+
+
+class JsonFeed(Atom1Feed):
+    """
+    A JSON Feed, built from the same feed and entry data as Atom1Feed.
+
+    Entries are encoded and written one at a time, so rendering does not
+    build the whole document in memory.
+    """
+    # Spec: https://www.jsonfeed.org/version/1.1/
+    mime_type = 'application/feed+json; charset=utf-8'
+    version = u'https://jsonfeed.org/version/1.1'
+
+    def get_handler(self, outfile, encoding):
+        from feedgenerator.utils.jsonutils import JsonFeedGenerator
+        return JsonFeedGenerator(outfile, encoding, self.write_buffer_size,
+                                 sort_keys=self.canonical)
+
+    def start_root_element(self, handler):
+        handler.startObject()
+        handler.addMember(u'version', self.version)
+
+    def end_root_element(self, handler):
+        handler.endObject()
+
+    @staticmethod
+    def link_href(links, rel):
+        for link in links:
+            if link.get('rel', 'alternate') == rel:
+                return link['href']
+
+    @staticmethod
+    def json_authors(authors):
+        return [minimized({'name': author.get('name'),
+                           'url': author.get('uri')})
+                for author in authors]
+
+    def add_root_elements(self, handler):
+        meta = self.meta
+        links = meta.get('links', ())
+        members = minimized({
+            'title': meta['title'],
+            'home_page_url': self.link_href(links, 'alternate'),
+            'feed_url': self.link_href(links, 'self'),
+            'description': meta.get('subtitle'),
+            'icon': meta.get('logo'),
+            'favicon': meta.get('icon'),
+            'language': meta.get('language'),
+        })
+        if meta.get('authors'):
+            members['authors'] = self.json_authors(meta['authors'])
+        for key in ('title', 'home_page_url', 'feed_url', 'description',
+                    'icon', 'favicon', 'authors', 'language'):
+            if key in members:
+                handler.addMember(key, members[key])
+
+    def entry_item(self, entry):
+        """
+        Returns the JSON Feed item for a prepared entry.
+        """
+        links = entry.get('links', ())
+        item = minimized({
+            'id': entry['id'],
+            'url': self.link_href(links, 'alternate'),
+            'external_url': self.link_href(links, 'related'),
+            'title': entry['title'],
+            'date_modified': self.rfc3339_date(entry['updated']),
+        })
+        content = entry.get('content')
+        if content and content.get('type') in ('html', 'xhtml'):
+            item['content_html'] = content['text']
+        elif content:
+            item['content_text'] = content['text']
+        else:
+            # One of content_html and content_text is required.
+            item['content_text'] = entry.get('summary', {}).get('text', u'')
+        if 'summary' in entry:
+            item['summary'] = entry['summary']['text']
+        if 'published' in entry:
+            item['date_published'] = self.rfc3339_date(entry['published'])
+        if entry.get('authors'):
+            item['authors'] = self.json_authors(entry['authors'])
+        if entry.get('categories'):
+            item['tags'] = [category['term']
+                            for category in entry['categories']]
+        attachments = [minimized({'url': link['href'],
+                                  'mime_type': link.get('type'),
+                                  'size_in_bytes': byte_length(
+                                      link.get('length'))})
+                       for link in links if link.get('rel') == 'enclosure']
+        if attachments:
+            item['attachments'] = attachments
+        return item
+
+    def write_entry(self, handler, entry):
+        handler.addItem(self.entry_item(entry))
+
+    def entry_fragment(self, handler, entry):
+        return handler.encodeItem(self.entry_item(entry))
+
+    def write_fragment(self, handler, fragment):
+        handler.addEncodedItem(fragment)
 
 
 # This isolates the decision of what the system default is, so calling code can
@@ -0,0 +1,93 @@
+"""
+Publishing feeds as static files, for web servers that serve them (and
+their precompressed .gz siblings, as nginx's gzip_static does) directly.
+
+Sample usage:
+
+>>> from feedgenerator.publish import publish
+>>> publish(feed, '/var/www/feeds/news.atom')
+25
+>>> publish(feed, '/var/www/feeds/news.atom')     # unchanged: not rewritten
+
+The feed is rendered once, into temporary files in the target directory,
+which are flushed to disk and then renamed over news.atom and news.atom.gz,
+so readers see the old or the new files, never a partial one. The feed's
+fingerprint is kept in the hidden file .news.atom.fingerprint; as long as
+it matches, publishing does not render at all.
+"""
+import errno
+import gzip
+import os
+from feedgenerator.utils.files import (DEFAULT_MODE, AtomicFile,
+    write_atomically)
+
+
+def fingerprint_path(path):
+    "Returns the path of the file holding the fingerprint of path's feed."
+    directory, name = os.path.split(path)
+    return os.path.join(directory, '.%s.fingerprint' % name)
+
+
+def _read(path):
+    try:
+        with open(path, 'rb') as fp:
+            return fp.read()
+    except IOError, e:
+        if e.errno != errno.ENOENT:
+            raise
+        return None
+
+
+def publish(feed, path, encoding='utf-8', compress=True, max_bytes=None,
+            force=False, mode=DEFAULT_MODE):
+    """
+    Renders feed to the file path and, if compress, a gzipped copy to
+    path + '.gz', in one pass, and renames both into place. Without
+    compress, a path + '.gz' left from earlier publishes is removed.
+    Returns the number of entries written, or None if the feed was not
+    rendered because its fingerprint, encoding and options are those of the
+    last publish to path and the files are still there (force publishes
+    regardless).
+
+    max_bytes is as for SyndicationFeed.write(); mode is the files'
+    permissions.
+    """
+    path = os.path.abspath(path)
+    name = os.path.basename(path)
+    targets = [path, path + '.gz'] if compress else [path]
+    stamp = '%s %s %s %s\n' % (feed.fingerprint(), encoding.lower(),
+                               'gzip' if compress else 'plain', max_bytes)
+    stamp_path = fingerprint_path(path)
+    if not force and _read(stamp_path) == stamp and \
+            all(os.path.exists(target) for target in targets):
+        return None
+    outfiles = []
+    try:
+        for target in targets:
+            outfiles.append(AtomicFile(target, mode))
+        sinks = outfiles[:1]
+        if compress:
+            # The header names the target, not the temporary file.
+            gz_file = gzip.GzipFile(name, 'wb', fileobj=outfiles[1].file,
+                                    mtime=0)
+            sinks.append(gz_file)
+        count = feed.write(sinks, encoding, max_bytes=max_bytes)
+        if compress:
+            gz_file.close()
+        if not compress:
+            # Servers would go on serving a stale .gz in place of path.
+            try:
+                os.unlink(path + '.gz')
+            except OSError, e:
+                if e.errno != errno.ENOENT:
+                    raise
+        # The .gz first, so it is current by the time the plain file is.
+        for outfile in reversed(outfiles):
+            outfile.commit()
+    except:
+        for outfile in outfiles:
+            outfile.discard()
+        raise
+    # Recorded last, so an interrupted publish is redone next time.
+    write_atomically(stamp_path, stamp, mode)
+    return count
@@ -0,0 +1,202 @@
+"""
+Rendering feeds in the background once bursts of changes have settled.
+
+Sample usage:
+
+>>> from feedgenerator.scheduler import ObservableFeedMixin, RenderScheduler
+>>> class NewsFeed(ObservableFeedMixin, Atom1Feed):
+...     pass
+>>> scheduler = RenderScheduler(quiet=2.0)
+>>> feed = NewsFeed(title=u'News', author=u'Newsroom')
+>>> scheduler.add(feed, '/var/www/feeds/news.atom')
+>>> for item in published_items:
+...     feed.add_entry(**item)            # renders once, 2s after the last
+
+Feeds that are not observable can be marked with scheduler.changed(feed).
+The scheduler renders from a background thread; feeds changed by other
+threads while they render should be concurrent feeds
+(feedgenerator.concurrent).
+"""
+import sys
+import threading
+import time
+import traceback
+from feedgenerator.utils.files import DEFAULT_MODE, write_atomically
+
+
+class ObservableFeedMixin(object):
+    """
+    Calls changed() after every change to the feed's entries, which calls
+    the callables in observers with the feed. Changes to the meta data are
+    not observed; call changed() after them.
+
+    Mix in before the feed class: class MyFeed(ObservableFeedMixin, Atom1Feed)
+    """
+    def __new__(cls, *args, **kwargs):
+        feed = super(ObservableFeedMixin, cls).__new__(cls, *args, **kwargs)
+        feed.observers = []
+        return feed
+
+    def changed(self):
+        super(ObservableFeedMixin, self).changed()
+        for observer in self.observers:
+            observer(self)
+
+    def __iadd__(self, entries):
+        result = super(ObservableFeedMixin, self).__iadd__(entries)
+        self.changed()
+        return result
+
+
+def _observed(name):
+    "Returns a method doing list method name and calling changed()."
+    def method(self, *args, **kwargs):
+        result = getattr(super(ObservableFeedMixin, self), name)(*args,
+                                                                 **kwargs)
+        self.changed()
+        return result
+    method.__name__ = name
+    return method
+
+for _name in ('append', 'extend', 'insert', 'pop', 'remove', 'reverse',
+              'sort', '__setitem__', '__delitem__', '__setslice__',
+              '__delslice__'):
+    setattr(ObservableFeedMixin, _name, _observed(_name))
+del _name
+
+
+class RenderScheduler(object):
+    """
+    Renders feeds marked as changed once no change has come in for quiet
+    seconds, on a background thread, and publishes the output to each feed's
+    sink: a file path, written atomically, or a callable taking the data.
+
+    mode -- the permissions of the files written to paths
+    max_delay -- if given, feeds that keep changing are rendered no later
+                 than this many seconds after the first unrendered change
+    on_error -- callable(feed, exc_info) for failed renders; by default
+                the traceback is printed to stderr
+    """
+    def __init__(self, quiet=1.0, max_delay=None, encoding='utf-8',
+                 on_error=None, mode=DEFAULT_MODE):
+        self.quiet = quiet
+        self.max_delay = max_delay
+        self.encoding = encoding
+        self.mode = mode
+        self.on_error = on_error
+        self._sinks = {}
+        self._due = {}
+        self._first_change = {}
+        self._condition = threading.Condition()
+        self._render_lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    def add(self, feed, sink):
+        "Publishes feed to sink from now on, observing it if it can be."
+        with self._condition:
+            self._sinks[id(feed)] = (feed, sink)
+        if isinstance(feed, ObservableFeedMixin):
+            feed.observers.append(self.changed)
+
+    def remove(self, feed):
+        if isinstance(feed, ObservableFeedMixin) and \
+                self.changed in feed.observers:
+            feed.observers.remove(self.changed)
+        with self._condition:
+            key = id(feed)
+            self._sinks.pop(key, None)
+            self._due.pop(key, None)
+            self._first_change.pop(key, None)
+
+    def changed(self, feed):
+        "Marks feed as changed, (re)starting its quiet window."
+        with self._condition:
+            key = id(feed)
+            if key not in self._sinks or self._closed:
+                return
+            now = time.time()
+            due = now + self.quiet
+            first = self._first_change.setdefault(key, now)
+            if self.max_delay is not None:
+                due = min(due, first + self.max_delay)
+            self._due[key] = due
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                name='RenderScheduler')
+                self._thread.daemon = True
+                self._thread.start()
+            self._condition.notify()
+
+    def pending(self):
+        "Returns the number of changed feeds waiting to be rendered."
+        with self._condition:
+            return len(self._due)
+
+    def _take(self, due_by=None):
+        """
+        Removes and returns the feeds and sinks of the changed feeds due by
+        due_by (all changed feeds if None). Must be called with the lock
+        held.
+        """
+        keys = [key for key, due in self._due.iteritems()
+                if due_by is None or due <= due_by]
+        for key in keys:
+            del self._due[key]
+            del self._first_change[key]
+        return [self._sinks[key] for key in keys]
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        return
+                    now = time.time()
+                    taken = self._take(now)
+                    if taken:
+                        break
+                    if self._due:
+                        self._condition.wait(min(self._due.values()) - now)
+                    else:
+                        self._condition.wait()
+            for feed, sink in taken:
+                self.render(feed, sink)
+
+    def render(self, feed, sink):
+        "Renders feed and publishes it to sink, reporting failures."
+        # One at a time, so a render never overtakes a later one.
+        with self._render_lock:
+            try:
+                data = feed.write_string(self.encoding)
+                if callable(sink):
+                    sink(data)
+                else:
+                    write_atomically(sink, data, self.mode)
+            except Exception:
+                if self.on_error is not None:
+                    self.on_error(feed, sys.exc_info())
+                else:
+                    traceback.print_exc()
+
+    def flush(self):
+        """
+        Renders all changed feeds now, in the calling thread, and returns
+        how many it rendered.
+        """
+        with self._condition:
+            taken = self._take()
+        for feed, sink in taken:
+            self.render(feed, sink)
+        return len(taken)
+
+    def close(self, flush=True):
+        "Stops the background thread, first rendering changed feeds if flush."
+        if flush:
+            self.flush()
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
@@ -0,0 +1,70 @@
+"""
+Snapshots of prepared feeds, for restoring them without redoing the work of
+add_entry()/prepare_entry().
+
+Sample usage:
+
+>>> from feedgenerator import snapshot
+>>> with open('feed.snapshot', 'wb') as fp:
+...     snapshot.dump(feed, fp)
+>>> with open('feed.snapshot', 'rb') as fp:
+...     feed = snapshot.load(fp)
+
+A snapshot holds the feed class, its meta data, its settings and its
+prepared entries, pickled. Only load snapshots from a trusted source, i.e.
+ones you wrote.
+"""
+import cPickle as pickle
+import zlib
+from feedgenerator.generator import SyndicationFeed
+
+MAGIC = 'FGSNAP2'
+PLAIN, COMPRESSED = '-', 'z'
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def dumps(feed, compress=False):
+    """
+    Returns a snapshot of feed as a string. If compress is true, the pickled
+    data is deflated, trading dump/load speed for size.
+    """
+    cls = feed.__class__
+    payload = pickle.dumps(
+        (cls.__module__, cls.__name__, feed.meta, feed.settings(), list(feed)),
+        pickle.HIGHEST_PROTOCOL)
+    if compress:
+        return MAGIC + COMPRESSED + zlib.compress(payload)
+    return MAGIC + PLAIN + payload
+
+
+def loads(data):
+    """
+    Returns the feed stored in a snapshot string made by dumps().
+    """
+    if data[:len(MAGIC)] != MAGIC:
+        raise SnapshotError('Not a feed snapshot.')
+    flag, payload = data[len(MAGIC)], data[len(MAGIC) + 1:]
+    if flag == COMPRESSED:
+        payload = zlib.decompress(payload)
+    elif flag != PLAIN:
+        raise SnapshotError('Unknown snapshot flag %r.' % flag)
+    module, name, meta, settings, entries = pickle.loads(payload)
+    cls = getattr(__import__(module, {}, {}, [name]), name)
+    if not issubclass(cls, SyndicationFeed):
+        raise SnapshotError('%s.%s is not a feed class.' % (module, name))
+    feed = cls.from_prepared(meta, entries)
+    feed.__dict__.update(settings)
+    return feed
+
+
+def dump(feed, fp, compress=False):
+    "Writes a snapshot of feed to the file-like object fp."
+    fp.write(dumps(feed, compress))
+
+
+def load(fp):
+    "Reads a snapshot written by dump() from the file-like object fp."
+    return loads(fp.read())
@@ -0,0 +1,185 @@
+"""
+Date-ordered rendering of more entries than fit in memory.
+
+Sample usage:
+
+>>> from feedgenerator.sorting import write_sorted
+>>> feed = Atom1Feed(title=u'Everything', author=u'Archive')
+>>> entries = (feed.prepare_entry(row) for row in read_rows())
+>>> write_sorted(feed, entries, fp, memory_bytes=64 * 1024 * 1024)
+
+renders feed's meta data with the entries, newest first, holding no more
+than about memory_bytes of them in memory at a time. The rest are kept in
+sorted runs in temporary files and merged while rendering.
+"""
+import cPickle as pickle
+import heapq
+import tempfile
+from operator import itemgetter
+
+DEFAULT_MEMORY_BYTES = 32 * 1024 * 1024
+DEFAULT_MERGE_WIDTH = 64
+
+
+def entry_date(entry):
+    "Returns the updated (Atom) or pubdate (RSS) date of a prepared entry."
+    return entry.get('updated') or entry.get('pubdate')
+
+
+class _Reversed(object):
+    "Wraps a sort key to invert its order."
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+
+def _read_run(fp):
+    fp.seek(0)
+    load = pickle.Unpickler(fp).load
+    while True:
+        try:
+            yield load()
+        except EOFError:
+            return
+
+
+class ExternalSort(object):
+    """
+    Sorts entries by key, newest first unless reverse is false, in memory
+    up to memory_bytes of (pickled) entries and by merging sorted runs
+    written to temporary files in tempdir beyond that. The sort is stable.
+
+    Runs are merged in tiers: when merge_width runs of one level have been
+    written, they are merged into one run of the next level. Each entry is
+    thus rewritten once per level, and the levels grow logarithmically
+    with the number of entries.
+
+    Add entries with add() or extend(), then iterate over the sort to get
+    them in order, and close() it to remove the temporary files.
+    """
+    def __init__(self, key=entry_date, reverse=True,
+                 memory_bytes=DEFAULT_MEMORY_BYTES, tempdir=None,
+                 merge_width=DEFAULT_MERGE_WIDTH):
+        self.key = key
+        self.reverse = reverse
+        self.memory_bytes = memory_bytes
+        self.tempdir = tempdir
+        self.merge_width = merge_width
+        self.latest = None
+        self.count = 0
+        self._latest_key = None
+        self._buffer = []
+        self._buffered = 0
+        # The runs of each level, lowest first, each level's oldest first.
+        self._levels = []
+
+    def __len__(self):
+        return self.count
+
+    def add(self, entry):
+        key = self.key(entry)
+        if self.latest is None or key > self._latest_key:
+            self.latest, self._latest_key = entry, key
+        data = pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)
+        self._buffer.append((key, data))
+        self._buffered += len(data)
+        self.count += 1
+        if self._buffered >= self.memory_bytes:
+            self._spill()
+
+    def extend(self, entries):
+        for entry in entries:
+            self.add(entry)
+
+    def _sorted_buffer(self):
+        self._buffer.sort(key=itemgetter(0), reverse=self.reverse)
+        return self._buffer
+
+    def _new_run(self, entries):
+        fp = tempfile.TemporaryFile(dir=self.tempdir, prefix='feedsort')
+        for data in entries:
+            fp.write(data)
+        return fp
+
+    def _spill(self):
+        run = self._new_run(data for key, data in self._sorted_buffer())
+        self._buffer, self._buffered = [], 0
+        levels = self._levels
+        level = 0
+        while True:
+            if level == len(levels):
+                levels.append([])
+            levels[level].append(run)
+            if len(levels[level]) < self.merge_width:
+                break
+            runs, levels[level] = levels[level], []
+            run = self._new_run(
+                pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)
+                for entry in self._merge([_read_run(fp) for fp in runs]))
+            for fp in runs:
+                fp.close()
+            level += 1
+
+    def _runs(self):
+        "Returns all runs, oldest first: runs of higher levels are older."
+        return [fp for runs in reversed(self._levels) for fp in runs]
+
+    def _merge(self, iterables):
+        key = self.key
+        if self.reverse:
+            key = lambda entry, key=key: _Reversed(key(entry))
+        # The index breaks ties, keeping the sort stable, and saves
+        # comparing entries.
+        heap = []
+        for index, iterable in enumerate(iterables):
+            for entry in iterable:
+                heap.append((key(entry), index, entry, iterable))
+                break
+        heapq.heapify(heap)
+        while heap:
+            _, index, entry, iterable = heap[0]
+            yield entry
+            for entry in iterable:
+                heapq.heapreplace(heap, (key(entry), index, entry, iterable))
+                break
+            else:
+                heapq.heappop(heap)
+
+    def __iter__(self):
+        buffered = (pickle.loads(data) for key, data in self._sorted_buffer())
+        runs = self._runs()
+        if not runs:
+            return buffered
+        return self._merge([_read_run(fp) for fp in runs] + [buffered])
+
+    def close(self):
+        for fp in self._runs():
+            fp.close()
+        self._levels = []
+        self._buffer, self._buffered = [], 0
+
+
+def write_sorted(feed, entries, outfile, encoding='utf-8', **options):
+    """
+    Renders feed's meta data with the given prepared entries instead of the
+    feed's own, sorted with an ExternalSort made with options, to outfile.
+    Returns the number of entries written.
+
+    Root elements derived from the entries (such as Atom's updated and
+    RSS's lastBuildDate) are computed from the latest entry.
+    """
+    entries_sort = ExternalSort(**options)
+    try:
+        entries_sort.extend(entries)
+        latest = entries_sort.latest
+        head = feed.with_entries([latest] if latest is not None else [])
+        return head.write_stream(outfile, entries_sort, encoding)
+    finally:
+        entries_sort.close()
@@ -0,0 +1,193 @@
+"""
+Opt-in instrumentation for feed rendering.
+
+Sample usage:
+
+>>> from feedgenerator.stats import RenderStats
+>>> stats = RenderStats()
+>>> feed.write(fp, 'utf-8', stats=stats)
+>>> stats.phases['entries'], stats.entry_count, stats.byte_count
+>>> stats.steps['date_formatting'], stats.steps['encoding']
+
+Steps done while preparing entries, such as escaping their URIs, are timed
+when they are added within stats.instrument(feed):
+
+>>> with stats.instrument(feed):
+...     feed.add_entries(items)
+
+Feeds rendered without a stats object take the plain code path, so the
+instrumentation costs nothing unless it is asked for.
+"""
+import heapq
+import time
+from feedgenerator.utils.writers import to_file
+
+
+class _CountingFile(object):
+    "Wraps a file-like object and counts the bytes written to it."
+    def __init__(self, outfile):
+        self.outfile = outfile
+        self.byte_count = 0
+
+    def write(self, data):
+        self.byte_count += len(data)
+        self.outfile.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.outfile, name)
+
+
+# The helpers feeds call through themselves (see SyndicationFeed), by the
+# step they are timed as.
+TIMED_HELPERS = (
+    ('rfc2822_date', 'date_formatting'),
+    ('rfc3339_date', 'date_formatting'),
+    ('atom_date', 'date_formatting'),
+    ('iri_to_uri', 'uri_escaping'),
+)
+# The feed attributes instrument() sets.
+_INSTRUMENTED = [name for name, step in TIMED_HELPERS] + [
+    'get_handler', '_instrumented_by']
+
+
+class RenderStats(object):
+    """
+    Collects timings of the phases of SyndicationFeed.write().
+
+    Phases are "start" (XML declaration and root element), "root_elements",
+    "entries" and "end"; their wall times in seconds accumulate in the
+    phases dict, so one instance can collect several renders. Callers can
+    time their own work (e.g. add_entries) with the phase() context manager.
+
+    Within the phases, the time spent on the steps "date_formatting",
+    "uri_escaping" and "encoding" (of the output into bytes) accumulates in
+    the steps dict.
+
+    on_entry_rendered -- callable(entry, seconds) called after each entry
+    on_phase_done -- callable(name, seconds) called after each phase
+    slowest -- number of slowest entries to keep in slowest_entries
+    """
+    def __init__(self, on_entry_rendered=None, on_phase_done=None, slowest=10):
+        self.on_entry_rendered = on_entry_rendered
+        self.on_phase_done = on_phase_done
+        self.slowest = slowest
+        self.phases = {}
+        self.steps = {}
+        self.entry_count = 0
+        self.byte_count = 0
+        self._slowest = []
+
+    @property
+    def slowest_entries(self):
+        """
+        A list of (seconds, entry) tuples of the slowest entries rendered so
+        far, slowest first.
+        """
+        return [(seconds, entry) for seconds, _, entry
+                in sorted(self._slowest, reverse=True)]
+
+    def phase_done(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        if self.on_phase_done is not None:
+            self.on_phase_done(name, seconds)
+
+    def entry_rendered(self, entry, seconds):
+        self.entry_count += 1
+        if self.slowest:
+            item = (seconds, self.entry_count, entry)
+            if len(self._slowest) < self.slowest:
+                heapq.heappush(self._slowest, item)
+            elif seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, item)
+        if self.on_entry_rendered is not None:
+            self.on_entry_rendered(entry, seconds)
+
+    def phase(self, name):
+        "Returns a context manager that times its block as the named phase."
+        return _Phase(self, name)
+
+    def timed(self, step, function):
+        "Returns function, adding the time spent in it to the named step."
+        steps = self.steps
+        def timed_function(*args, **kwargs):
+            started = time.time()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                steps[step] = steps.get(step, 0.0) + time.time() - started
+        return timed_function
+
+    def instrument(self, feed):
+        """
+        Returns a context manager within which feed's helpers and output
+        encoding are timed as steps. It sets attributes of feed, so feed
+        should not be used by other threads meanwhile.
+        """
+        return _Instrumented(self, feed)
+
+    def timed_entries(self, entries):
+        "Yields entries, recording the time until the next one is asked for."
+        for entry in entries:
+            started = time.time()
+            yield entry
+            self.entry_rendered(entry, time.time() - started)
+
+    def render(self, feed, outfile, entries=None, encoding='utf-8',
+               max_bytes=None):
+        """
+        Renders feed to outfile through SyndicationFeed.write_stream(),
+        recording timings and counts on the way. Returns the number of
+        entries written.
+        """
+        outfile = _CountingFile(to_file(outfile))
+        with self.instrument(feed):
+            count = feed.write_stream(
+                outfile, self.timed_entries(feed if entries is None
+                                            else entries),
+                encoding, max_bytes, self.phase)
+        self.byte_count += outfile.byte_count
+        return count
+
+
+class _Instrumented(object):
+    def __init__(self, stats, feed):
+        self.stats, self.feed = stats, feed
+        self.saved = None
+
+    def __enter__(self):
+        stats, feed = self.stats, self.feed
+        if feed.__dict__.get('_instrumented_by') is stats:
+            return
+        self.saved = dict((name, feed.__dict__[name]) for name in _INSTRUMENTED
+                          if name in feed.__dict__)
+        for name, step in TIMED_HELPERS:
+            setattr(feed, name, stats.timed(step, getattr(feed, name)))
+        get_handler = feed.get_handler
+        def timed_get_handler(outfile, encoding):
+            handler = get_handler(outfile, encoding)
+            handler.wrap_encoder(
+                lambda encode: stats.timed('encoding', encode))
+            return handler
+        feed.get_handler = timed_get_handler
+        feed._instrumented_by = stats
+
+    def __exit__(self, *exc_info):
+        if self.saved is None:
+            return
+        feed = self.feed
+        for name in _INSTRUMENTED:
+            if name in self.saved:
+                setattr(feed, name, self.saved[name])
+            else:
+                delattr(feed, name)
+
+
+class _Phase(object):
+    def __init__(self, stats, name):
+        self.stats, self.name = stats, name
+
+    def __enter__(self):
+        self.started = time.time()
+
+    def __exit__(self, *exc_info):
+        self.stats.phase_done(self.name, time.time() - self.started)
@@ -0,0 +1,193 @@
+"""
+A persistent store of feeds and their entries in an SQLite database.
+
+Sample usage:
+
+>>> from feedgenerator.store import FeedStore
+>>> store = FeedStore('feeds.db')
+>>> store.save('news', feed)       # class, meta data, settings and entries
+>>> store.upsert('news', [feed.prepare_entry(row) for row in changed_rows])
+>>> store.write('news', fp, limit=20)         # the 20 newest entries
+
+Entries are stored pickled, keyed by their id (as in
+feedgenerator.delta.entry_id()) and indexed by date, so write() renders the
+newest entries, or a page of them, from a range scan of the date index,
+unpickling one entry at a time. Only open stores you wrote.
+"""
+import cPickle as pickle
+import sqlite3
+from itertools import chain
+from feedgenerator.delta import entry_id
+from feedgenerator.generator import SyndicationFeed
+from feedgenerator.sorting import entry_date
+from feedgenerator.utils.timezone import is_aware
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS feeds (
+    name TEXT PRIMARY KEY,
+    module TEXT NOT NULL,
+    class TEXT NOT NULL,
+    meta BLOB NOT NULL,
+    settings BLOB
+);
+CREATE TABLE IF NOT EXISTS entries (
+    feed TEXT NOT NULL,
+    id TEXT NOT NULL,
+    updated TEXT,
+    data BLOB NOT NULL,
+    PRIMARY KEY (feed, id)
+);
+CREATE INDEX IF NOT EXISTS entries_updated ON entries (feed, updated, id);
+'''
+
+
+class StoreError(LookupError):
+    pass
+
+
+def sort_date(entry):
+    """
+    Returns the date of entry as an ISO 8601 string in UTC, which sorts like
+    the date, or None if it has none.
+    """
+    date = entry_date(entry)
+    if date is None:
+        return None
+    if is_aware(date):
+        date = date.replace(tzinfo=None) - date.utcoffset()
+    return date.isoformat()
+
+
+def _dumps(value):
+    return sqlite3.Binary(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+class FeedStore(object):
+    """
+    Feeds stored by name in the SQLite database at path (or ':memory:').
+    """
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        columns = [row[1] for row in
+                   self.connection.execute('PRAGMA table_info(feeds)')]
+        if 'settings' not in columns:
+            # A store written before settings were stored.
+            with self.connection:
+                self.connection.execute(
+                    'ALTER TABLE feeds ADD COLUMN settings BLOB')
+
+    def save(self, name, feed):
+        """
+        Stores the class, meta data and settings (see
+        SyndicationFeed.settings()) of feed, and upserts its entries.
+        """
+        cls = feed.__class__
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO feeds (name, module, class, meta,'
+                ' settings) VALUES (?, ?, ?, ?, ?)',
+                (name, cls.__module__, cls.__name__, _dumps(feed.meta),
+                 _dumps(feed.settings())))
+            self._upsert(name, feed)
+
+    def upsert(self, name, entries):
+        """
+        Adds the given prepared entries to the named feed, replacing stored
+        entries with the same ids.
+        """
+        with self.connection:
+            self._upsert(name, entries)
+
+    def _upsert(self, name, entries):
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)',
+            ((name, unicode(entry_id(entry)), sort_date(entry), _dumps(entry))
+             for entry in entries))
+
+    def delete(self, name, ids=None):
+        "Deletes the entries with the given ids, or the whole named feed."
+        with self.connection:
+            if ids is None:
+                self.connection.execute('DELETE FROM feeds WHERE name = ?',
+                                        (name,))
+                self.connection.execute('DELETE FROM entries WHERE feed = ?',
+                                        (name,))
+            else:
+                self.connection.executemany(
+                    'DELETE FROM entries WHERE feed = ? AND id = ?',
+                    ((name, unicode(id)) for id in ids))
+
+    def count(self, name):
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM entries WHERE feed = ?', (name,)).fetchone()[0]
+
+    def _head(self, name, entries=()):
+        "Returns the named feed, with its settings, holding entries."
+        row = self.connection.execute(
+            'SELECT module, class, meta, settings FROM feeds WHERE name = ?',
+            (name,)).fetchone()
+        if row is None:
+            raise StoreError('No feed named %r.' % (name,))
+        module, class_name, meta, settings = row
+        cls = getattr(__import__(module, {}, {}, [class_name]), class_name)
+        if not issubclass(cls, SyndicationFeed):
+            raise StoreError('%s.%s is not a feed class.' % (module, class_name))
+        feed = cls.from_prepared(pickle.loads(str(meta)), entries)
+        if settings is not None:
+            feed.__dict__.update(pickle.loads(str(settings)))
+        return feed
+
+    def entries(self, name, limit=None, offset=0, before=None):
+        """
+        Returns an iterator over the entries of the named feed, newest first,
+        unpickling them as they are read.
+
+        limit -- the maximum number of entries (all by default)
+        offset -- the number of newest entries to skip
+        before -- the id of an entry; only entries older than it are
+                  returned, which pages through a feed without the cost of
+                  skipping offset rows
+        """
+        query = 'SELECT data FROM entries WHERE feed = ?'
+        params = [name]
+        if before is not None:
+            row = self.connection.execute(
+                'SELECT updated FROM entries WHERE feed = ? AND id = ?',
+                (name, unicode(before))).fetchone()
+            if row is None:
+                raise StoreError('No entry %r in feed %r.' % (before, name))
+            if row[0] is None:
+                query += ' AND updated IS NULL AND id < ?'
+                params.append(unicode(before))
+            else:
+                query += (' AND (updated < ? OR updated IS NULL OR'
+                          ' (updated = ? AND id < ?))')
+                params.extend([row[0], row[0], unicode(before)])
+        query += ' ORDER BY updated DESC, id DESC LIMIT ? OFFSET ?'
+        params.extend([-1 if limit is None else limit, offset])
+        cursor = self.connection.execute(query, params)
+        return (pickle.loads(str(data)) for data, in cursor)
+
+    def feed(self, name, limit=None, offset=0, before=None):
+        "Returns the named feed holding the entries entries() returns."
+        return self._head(name, self.entries(name, limit, offset, before))
+
+    def write(self, name, outfile, encoding='utf-8', limit=None, offset=0,
+              before=None):
+        """
+        Renders the named feed with the entries entries() returns to outfile,
+        streaming them from the database into the serializer, and returns
+        the number of entries written.
+        """
+        head = self._head(name)
+        entries = self.entries(name, limit, offset, before)
+        # The newest entry is all the root elements need.
+        for entry in entries:
+            head.append(entry)
+            entries = chain([entry], entries)
+            break
+        return head.write_stream(outfile, entries, encoding)
+
+    def close(self):
+        self.connection.close()
@@ -1,4 +1,5 @@
 # -*- encoding: utf-8 -*-
+import cPickle as pickle
 import unittest
 import requests
 from datetime import datetime
@@ -35,6 +36,16 @@ class TestAtom1Feed(unittest.TestCase):
                       feed.write_string(self.encoding),
                       u'Feed output does not contain feed item title.')
 
+    def test_pickle(self):
+        feed = Atom1Feed([self.feed_item_kwargs], updated=datetime(2013, 5, 1),
+                         **self.feed_kwargs)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            restored = pickle.loads(pickle.dumps(feed, protocol))
+            self.assertEqual(restored.meta, feed.meta)
+            self.assertEqual(list(restored), list(feed))
+            self.assertEqual(len(restored.write_string(self.encoding)),
+                             len(feed.write_string(self.encoding)))
+
     @unittest.skip('No need to waste their resources')
     def test_feed_item(self):
         feed = Atom1Feed([self.feed_item_kwargs], **self.feed_kwargs)
@@ -48,3 +59,43 @@ class TestAtom1Feed(unittest.TestCase):
         self.assertIn(u'<h2>Congratulations!</h2>',
                       response.text,
                       u'Feed invalid.\n\n%s' % feed_string)
+
+
+class TestCanonicalAtom1Feed(unittest.TestCase):
+
+    meta = [('title', u'Feed Generator Updates'),
+            ('id', u'urn:feed'),
+            ('updated', datetime(2013, 5, 1)),
+            ('authors', ({'name': u'Twilight Sparkle', 'uri': u'/ts',
+                          'email': u'ts@example.org'},)),
+            ('links', ({'href': u'/feed', 'rel': u'self',
+                        'type': u'application/atom+xml'},))]
+    entry = [('title', u'New Release'),
+             ('id', u'urn:entry'),
+             ('updated', datetime(2013, 4, 1)),
+             ('categories', ({'term': u'releases', 'label': u'Releases'},)),
+             ('summary', {'text': u'Release notes.', 'type': u'text'})]
+
+    def _get_feeds(self, canonical):
+        from collections import OrderedDict
+        feeds = []
+        for order in (list, reversed):
+            feed = Atom1Feed.from_prepared(
+                OrderedDict(order(self.meta)),
+                [OrderedDict(order(self.entry))])
+            feed.canonical = canonical
+            feeds.append(feed)
+        return feeds
+
+    def test_canonical_output_is_byte_stable(self):
+        first, second = self._get_feeds(canonical=False)
+        self.assertNotEqual(first.write_string(), second.write_string())
+        first, second = self._get_feeds(canonical=True)
+        output = first.write_string()
+        self.assertEqual(output, second.write_string())
+        self.assertIn(u'<author><name>Twilight Sparkle</name><uri>/ts</uri>'
+                      u'<email>ts@example.org</email></author>', output)
+        self.assertIn(u'<link href="/feed" rel="self" '
+                      u'type="application/atom+xml"></link>', output)
+        self.assertLess(output.index('<id>urn:feed'),
+                        output.index('<title>Feed'))
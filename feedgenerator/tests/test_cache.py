@@ -0,0 +1,244 @@
+import fcntl
+import gzip
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from StringIO import StringIO
+from datetime import datetime, timedelta, tzinfo
+from feedgenerator.cache import RenderCache, SharedRenderCache
+from feedgenerator.generator import Atom1Feed, Rss201rev2Feed
+
+
+class TestSharedRenderCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _get_feed(self):
+        feed = Atom1Feed(title=u'Feed Generator Updates',
+                         updated=datetime(2013, 5, 1))
+        feed.add_entry(title=u'New Release', author=u'Twilight Sparkle',
+                       updated=datetime(2013, 4, 1))
+        return feed
+
+    def test_shared_between_instances(self):
+        feed = self._get_feed()
+        first = SharedRenderCache(self.directory)
+        second = SharedRenderCache(self.directory)
+        self.assertEqual(first.get('news', feed)[:], feed.write_string())
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        # Simulates another process finding the stored render.
+        feed.write_string = lambda *args: self.fail('Rendered again.')
+        self.assertEqual(second.get('news', feed)[:],
+                         first.get('news', feed)[:])
+        first.close()
+        second.close()
+
+    def test_invalidated_by_change(self):
+        feed = self._get_feed()
+        cache = SharedRenderCache(self.directory)
+        before = cache.get('news', feed)[:]
+        feed.add_entry(title=u'Another Release', author=u'Rarity',
+                       updated=datetime(2013, 4, 2))
+        after = cache.get('news', feed)[:]
+        self.assertNotEqual(before, after)
+        self.assertIn('Another Release', after)
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        cache.close()
+
+    def test_instances_at_different_states(self):
+        feed, changed = self._get_feed(), self._get_feed()
+        changed.meta['id'] = feed.meta['id']
+        changed[0]['id'] = feed[0]['id']
+        changed.add_entry(title=u'Another Release', author=u'Rarity',
+                          updated=datetime(2013, 4, 2))
+        first = SharedRenderCache(self.directory)
+        second = SharedRenderCache(self.directory)
+        first.get('news', feed)
+        second.get('news', changed)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+        self.assertEqual(first.get('news', feed)[:], feed.write_string())
+
+    def test_render_removed_by_another_process(self):
+        directory = self.directory
+
+        class RacingCache(SharedRenderCache):
+            def _store(self, name, feed, encoding):
+                fd = super(RacingCache, self)._store(name, feed, encoding)
+                os.unlink(os.path.join(directory, name))
+                return fd
+
+        feed = self._get_feed()
+        self.assertEqual(RacingCache(directory).get('news', feed)[:],
+                         feed.write_string())
+
+    def test_waits_for_concurrent_render(self):
+        feed = self._get_feed()
+        cache = SharedRenderCache(self.directory)
+        name = cache._prefix(u'news', 'utf-8') + feed.fingerprint()
+        # Another process is rendering the feed.
+        lock_fd = os.open(os.path.join(self.directory, '.lock.' + name),
+                          os.O_RDWR | os.O_CREAT)
+        fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        results = []
+        waiter = threading.Thread(
+            target=lambda: results.append(cache.get(u'news', feed)[:]))
+        waiter.start()
+        time.sleep(0.05)
+        self.assertEqual(results, [])
+        os.close(SharedRenderCache(self.directory)._store(name, feed,
+                                                          'utf-8'))
+        feed.write_string = lambda *args: self.fail('Rendered again.')
+        os.close(lock_fd)
+        waiter.join()
+        self.assertEqual(len(results), 1)
+        self.assertEqual(os.listdir(self.directory), [name])
+
+    def test_compression(self):
+        feed = self._get_feed()
+        cache = SharedRenderCache(self.directory, compression='gzip')
+        data = cache.get('news', feed)[:]
+        self.assertEqual(gzip.GzipFile(fileobj=StringIO(data)).read(),
+                         feed.write_string())
+        cache.close()
+
+    def test_fingerprint(self):
+        feed, other = self._get_feed(), self._get_feed()
+        other.meta['id'] = feed.meta['id']
+        other[0]['id'] = feed[0]['id']
+        self.assertEqual(feed.fingerprint(), other.fingerprint())
+        other.meta['title'] = u'Changed'
+        self.assertNotEqual(feed.fingerprint(), other.fingerprint())
+
+    def test_fingerprint_covers_settings(self):
+        feed = self._get_feed()
+        fingerprint = feed.fingerprint()
+        feed.canonical = True
+        self.assertNotEqual(feed.fingerprint(), fingerprint)
+        del feed.canonical
+        self.assertEqual(feed.fingerprint(), fingerprint)
+
+    def test_fingerprint_remembers_entries(self):
+        feed = self._get_feed()
+        first = feed.fingerprint()
+        # Edits in place are not seen until changed() is called.
+        feed[0]['title'] = u'Edited'
+        self.assertEqual(feed.fingerprint(), first)
+        feed.changed()
+        edited = feed.fingerprint()
+        self.assertNotEqual(edited, first)
+        self.assertEqual(feed.with_entries(list(feed)).fingerprint(), edited)
+        feed.add_entry(title=u'Another Release', author=u'Rarity',
+                       updated=datetime(2013, 4, 2))
+        self.assertEqual(feed.fingerprint(),
+                         feed.with_entries(list(feed)).fingerprint())
+        copy = feed.copy()
+        del feed[0]
+        self.assertEqual(feed.fingerprint(),
+                         feed.with_entries(list(feed)).fingerprint())
+        self.assertEqual(copy.fingerprint(),
+                         copy.with_entries(list(copy)).fingerprint())
+
+    def test_fingerprint_is_stable(self):
+        class Offset(tzinfo):
+            # No __repr__, so repr() shows the instance's address.
+            def utcoffset(self, date):
+                return timedelta(hours=2)
+
+        def get_feed():
+            feed = Rss201rev2Feed(u'title', u'/link/', u'description')
+            feed.add_entry(u'title', u'/link/', u'description',
+                           pubdate=datetime(2013, 4, 1, tzinfo=Offset()))
+            return feed
+
+        self.assertEqual(get_feed().fingerprint(), get_feed().fingerprint())
+        feed = get_feed()
+        feed[0]['unique_id'] = object()
+        self.assertRaises(TypeError, feed.fingerprint)
+
+
+class TestRenderCache(unittest.TestCase):
+
+    def _get_feed(self, title=u'Feed Generator Updates'):
+        feed = Atom1Feed(title=title, updated=datetime(2013, 5, 1))
+        feed.add_entry(title=u'New Release', author=u'Twilight Sparkle',
+                       updated=datetime(2013, 4, 1))
+        return feed
+
+    def test_cached_until_changed(self):
+        feed = self._get_feed()
+        cache = RenderCache()
+        data = cache.get(feed)
+        self.assertEqual(data, feed.write_string())
+        self.assertIs(cache.get(feed), data)
+        self.assertNotEqual(cache.get(feed, 'utf-16'), data)
+        feed.meta['title'] = u'Changed'
+        self.assertIn('Changed', cache.get(feed))
+        self.assertEqual(len(cache._renders), 2)
+
+    def test_hits_do_not_digest_entries(self):
+        feed = self._get_feed()
+        cache = RenderCache()
+        data = cache.get(feed)
+        # An in-place edit no fingerprint could digest goes unnoticed...
+        feed[0]['unique_id'] = object()
+        self.assertIs(cache.get(feed), data)
+        # ... until the feed is told about it.
+        feed.changed()
+        self.assertRaises(TypeError, cache.get, feed)
+
+    def test_lru_eviction(self):
+        feeds = [self._get_feed(u'Feed %d' % i) for i in range(3)]
+        size = len(feeds[0].write_string())
+        cache = RenderCache(max_bytes=2 * size)
+        cache.get(feeds[0], key='first')
+        cache.get(feeds[1], key='second')
+        cache.get(feeds[0], key='first')
+        cache.get(feeds[2], key='third')
+        self.assertEqual([key for key, _, _ in cache._renders],
+                         ['first', 'third'])
+        self.assertEqual(cache.size, 2 * size)
+
+    def test_sendfile_from_spilled_render(self):
+        directory = tempfile.mkdtemp()
+        try:
+            feed = self._get_feed()
+            cache = RenderCache(spill_size=0, spill_dir=directory)
+            expected = cache.get(feed, compression='gzip')
+            self.assertEqual(len(os.listdir(directory)), 1)
+            read_fd, write_fd = os.pipe()
+            size = cache.sendfile(write_fd, feed, compression='gzip')
+            os.close(write_fd)
+            with os.fdopen(read_fd, 'rb') as fp:
+                self.assertEqual(fp.read(), expected)
+            self.assertEqual(size, len(expected))
+            cache.clear()
+            self.assertEqual(os.listdir(directory), [])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_spilled_render_removed_meanwhile(self):
+        directory = tempfile.mkdtemp()
+        try:
+            feed = self._get_feed()
+            cache = RenderCache(spill_size=0, spill_dir=directory)
+            expected = cache.get(feed)
+            # Evicted between the lookup and the read.
+            data, fp = cache._lookup(feed, 'utf-8', None, None)
+            cache.clear()
+            with fp:
+                self.assertEqual(fp.read(), expected)
+            cache.get(feed)
+            # Removed behind the cache's back.
+            for name in os.listdir(directory):
+                os.unlink(os.path.join(directory, name))
+            self.assertEqual(cache.get(feed), expected)
+            self.assertEqual(len(os.listdir(directory)), 1)
+        finally:
+            shutil.rmtree(directory)
@@ -0,0 +1,94 @@
+import cPickle as pickle
+import threading
+import unittest
+from datetime import datetime
+from feedgenerator.concurrent import (ConcurrentAtom1Feed,
+    ConcurrentRss201rev2Feed)
+
+
+class TestConcurrentFeed(unittest.TestCase):
+
+    def _get_feed(self, count=0):
+        feed = ConcurrentRss201rev2Feed(u'title', u'/link/', u'description')
+        feed.chunk_size = 4
+        for i in range(count):
+            feed.add_entry(u'Entry %d' % i, u'/entry/%d' % i, u'')
+        return feed
+
+    def test_list_behaviour(self):
+        feed = self._get_feed(10)
+        self.assertEqual(len(feed), 10)
+        self.assertEqual([entry['title'] for entry in feed],
+                         [u'Entry %d' % i for i in range(10)])
+        self.assertEqual(feed[5]['title'], u'Entry 5')
+        self.assertEqual(feed[-1]['title'], u'Entry 9')
+        self.assertEqual([entry['title'] for entry in feed[8:]],
+                         [u'Entry 8', u'Entry 9'])
+        self.assertRaises(IndexError, lambda: feed[10])
+        self.assertIn(feed[3], feed)
+        del feed[0]
+        feed.insert(0, feed[-1])
+        self.assertEqual(len(feed), 10)
+        self.assertEqual(feed[0]['title'], u'Entry 9')
+
+    def test_snapshot_isolation(self):
+        feed = self._get_feed(6)
+        snapshot = feed.snapshot()
+        feed.add_entry(u'Entry 6', u'/entry/6', u'')
+        feed.sort(key=lambda entry: entry['title'], reverse=True)
+        self.assertEqual(len(snapshot), 6)
+        self.assertEqual(snapshot[0]['title'], u'Entry 0')
+        self.assertEqual(feed[0]['title'], u'Entry 6')
+        self.assertRaises(TypeError, snapshot.append, {})
+        self.assertNotIn('Entry 6', snapshot.write_string())
+        self.assertIn('Entry 6', feed.write_string())
+
+    def test_fingerprint(self):
+        feed = self._get_feed(6)
+        snapshot = feed.snapshot()
+        fingerprint = snapshot.fingerprint()
+        self.assertEqual(feed.fingerprint(), fingerprint)
+        feed.add_entry(u'Entry 6', u'/entry/6', u'')
+        self.assertNotEqual(feed.fingerprint(), fingerprint)
+        self.assertEqual(snapshot.fingerprint(), fingerprint)
+        feed.sort(key=lambda entry: entry['title'], reverse=True)
+        self.assertEqual(feed.fingerprint(),
+                         feed.with_entries(list(feed)).fingerprint())
+
+    def test_append_while_rendering(self):
+        feed = self._get_feed()
+        stop = threading.Event()
+
+        def writer():
+            for i in xrange(2000):
+                if stop.is_set():
+                    break
+                feed.add_entry(u'Entry %d' % i, u'/entry/%d' % i, u'')
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            for _ in range(10):
+                output = feed.write_string()
+                count = output.count('<entry>')
+                self.assertEqual(count, output.count('</entry>'))
+                # Entries are rendered in order without gaps.
+                self.assertIn('Entry %d<' % (count - 1) if count else '',
+                              output)
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_pickle(self):
+        feed = self._get_feed(5)
+        restored = pickle.loads(pickle.dumps(feed, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(restored, feed)
+        restored.add_entry(u'Entry 5', u'/entry/5', u'')
+        self.assertEqual(len(restored), 6)
+
+    def test_atom(self):
+        feed = ConcurrentAtom1Feed(title=u'Feed Generator Updates',
+                                   author=u'Twilight Sparkle',
+                                   updated=datetime(2013, 5, 1))
+        feed.add_entry(title=u'New Release', updated=datetime(2013, 4, 1))
+        self.assertIn('New Release', feed.write_string())
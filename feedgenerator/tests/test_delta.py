@@ -0,0 +1,99 @@
+import threading
+import unittest
+from datetime import datetime
+from wsgiref.util import setup_testing_defaults
+from feedgenerator.delta import FeedHistory, delta_feed
+from feedgenerator.generator import Atom1Feed, Rss201rev2Feed
+from feedgenerator.wsgi import FeedApplication
+
+
+class TestDeltaFeeds(unittest.TestCase):
+
+    def _get_feed(self):
+        feed = Rss201rev2Feed(u'title', u'/link/', u'description')
+        for i in range(3):
+            feed.add_entry(u'Entry %d' % i, u'/entry/%d' % i, u'',
+                           pubdate=datetime(2013, 4, i + 1))
+        return feed
+
+    def test_history(self):
+        feed = self._get_feed()
+        history = FeedHistory(size=2)
+        history.record(feed, 'v1')
+        self.assertEqual(history.delta(feed, 'v1'), [])
+        feed.add_entry(u'Entry 3', u'/entry/3', u'')
+        feed[0]['title'] = u'Entry 0, corrected'
+        history.record(feed, 'v2')
+        self.assertEqual([entry['link'] for entry in history.delta(feed, 'v1')],
+                         [u'/entry/0', u'/entry/3'])
+        history.record(feed, 'v3')
+        self.assertIs(history.delta(feed, 'v1'), None)
+
+    def test_history_shared_between_threads(self):
+        feed = self._get_feed()
+        history = FeedHistory(size=4)
+        errors = []
+
+        def serve(thread):
+            try:
+                for i in range(200):
+                    history.record(feed, 'v%d.%d' % (thread, i))
+                    history.delta(feed, 'v%d.%d' % (thread, i - 1))
+            except Exception, e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=serve, args=(thread,))
+                   for thread in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(history.versions), 4)
+
+    def test_delta_feed(self):
+        feed = self._get_feed()
+        history = FeedHistory()
+        history.record(feed, 'v1')
+        feed.add_entry(u'Entry 3', u'/entry/3', u'')
+        delta = delta_feed(feed, history, 'v1')
+        self.assertIs(type(delta), Rss201rev2Feed)
+        self.assertIs(delta.meta, feed.meta)
+        output = delta.write_string()
+        self.assertIn('Entry 3', output)
+        self.assertNotIn('Entry 2', output)
+        self.assertIs(delta_feed(feed, history, 'unknown'), None)
+
+    def test_wsgi(self):
+        feed = Atom1Feed(title=u'Feed Generator Updates',
+                         author=u'Twilight Sparkle')
+        feed.add_entry(title=u'Old Release', updated=datetime(2013, 4, 1))
+        application = FeedApplication(feed, history=FeedHistory())
+
+        def request(**headers):
+            environ = {'REQUEST_METHOD': 'GET'}
+            for name, value in headers.iteritems():
+                environ['HTTP_' + name.upper()] = value
+            setup_testing_defaults(environ)
+            response = {'body': []}
+
+            def start_response(status, headers, exc_info=None):
+                response['status'] = status
+                response['headers'] = dict(headers)
+                return response['body'].append
+
+            response['body'].extend(application(environ, start_response))
+            response['body'] = ''.join(response['body'])
+            return response
+
+        etag = request()['headers']['ETag']
+        feed.add_entry(title=u'New Release', updated=datetime(2013, 4, 2))
+        response = request(if_none_match=etag, a_im='feed')
+        self.assertEqual(response['status'], '226 IM Used')
+        self.assertEqual(response['headers']['IM'], 'feed')
+        self.assertNotEqual(response['headers']['ETag'], etag)
+        self.assertIn('New Release', response['body'])
+        self.assertNotIn('Old Release', response['body'])
+        response = request(if_none_match=etag)
+        self.assertEqual(response['status'], '200 OK')
+        self.assertIn('Old Release', response['body'])
@@ -0,0 +1,95 @@
+import unittest
+from datetime import datetime
+from feedgenerator.fanout import FanOut
+from feedgenerator.generator import Atom1Feed, JsonFeed
+from feedgenerator.contrib.gis.feeds import GeoAtom1Feed, GeoRSSFeed
+
+
+def terms(entry):
+    return [category['term'] for category in entry.get('categories', ())]
+
+
+class TestFanOut(unittest.TestCase):
+
+    def _get_entries(self):
+        feed = Atom1Feed(title=u'All', author=u'Twilight Sparkle')
+        for i in range(12):
+            feed.add_entry(title=u'Entry %d' % i, id=u'urn:%d' % i,
+                           updated=datetime(2013, 4, 1 + i),
+                           categories=[{'term': u'even' if i % 2 else u'odd'},
+                                       {'term': u'all'}])
+        return list(feed)
+
+    def test_matches_separate_renders(self):
+        entries = self._get_entries()
+        fan_out = FanOut(index=terms)
+        # Atom feeds without an updated date are dated now.
+        meta = {'author': u'A', 'updated': datetime(2013, 5, 1)}
+        definitions = [
+            ('even', Atom1Feed(title=u'Even', **meta), None, u'even'),
+            ('all', Atom1Feed(title=u'All', **meta), None, u'all'),
+            ('json', JsonFeed(title=u'JSON', **meta), None, u'odd'),
+            ('geo', GeoAtom1Feed(title=u'Geo', **meta), None, u'odd'),
+            ('late', Atom1Feed(title=u'Late', **meta),
+             lambda entry: entry['updated'] > datetime(2013, 4, 8), None),
+            ('none', Atom1Feed(title=u'None', **meta),
+             lambda entry: False, None),
+        ]
+        for name, feed, predicate, key in definitions:
+            fan_out.add(name, feed, predicate=predicate, key=key)
+        outputs = fan_out.write_strings(entries)
+        for name, feed, predicate, key in definitions:
+            included = [entry for entry in entries
+                        if (predicate(entry) if predicate else
+                            key in terms(entry))]
+            self.assertEqual(outputs[name],
+                             feed.with_entries(included).write_string(), name)
+
+    def test_renders_entries_once_per_kind(self):
+        rendered = []
+
+        class CountingFeed(Atom1Feed):
+            def write_entry(self, handler, entry):
+                rendered.append(entry['id'])
+                super(CountingFeed, self).write_entry(handler, entry)
+
+        fan_out = FanOut(index=terms)
+        for name in ('a', 'b', 'c'):
+            fan_out.add(name, CountingFeed(title=name, author=u'A'),
+                        key=u'all')
+        fan_out.write_strings(self._get_entries())
+        self.assertEqual(len(rendered), 12)
+
+    def test_feeds_with_different_settings(self):
+        entries = []
+        for i in range(3):
+            entry = GeoRSSFeed(u't', u'/l/', u'd').prepare_entry(
+                {'title': u'Entry %d' % i, 'link': u'/%d' % i,
+                 'description': u'', 'geometry': (1.23456, 2.34567)})
+            entries.append(entry)
+        coarse = GeoRSSFeed(u'Coarse', u'/coarse/', u'')
+        coarse.coords_precision = 1
+        fine = GeoRSSFeed(u'Fine', u'/fine/', u'')
+        fan_out = FanOut(index=lambda entry: [u'all'])
+        fan_out.add('coarse', coarse, key=u'all')
+        fan_out.add('fine', fine, key=u'all')
+        outputs = fan_out.write_strings(entries)
+        self.assertIn('2.3 1.2', outputs['coarse'])
+        for name, feed in (('coarse', coarse), ('fine', fine)):
+            self.assertEqual(outputs[name],
+                             feed.with_entries(entries).write_string())
+
+    def test_json_with_byte_order_mark(self):
+        entries = self._get_entries()
+        meta = {'author': u'A', 'updated': datetime(2013, 5, 1)}
+        fan_out = FanOut(index=terms, encoding='utf-16')
+        feed = JsonFeed(title=u'JSON', **meta)
+        fan_out.add('json', feed, key=u'all')
+        self.assertEqual(fan_out.write_strings(entries)['json'],
+                         feed.with_entries(entries).write_string('utf-16'))
+
+    def test_definitions(self):
+        fan_out = FanOut()
+        feed = Atom1Feed(title=u'Feed', author=u'A')
+        self.assertRaises(ValueError, fan_out.add, 'a', feed)
+        self.assertRaises(ValueError, fan_out.add, 'a', feed, key=u'all')
@@ -1,6 +1,7 @@
 import unittest
+from array import array
 from feedgenerator.contrib.gis.feeds import GeoRSSFeed
-from feedgenerator.contrib.gis.geometry import Geometry
+from feedgenerator.contrib.gis.geometry import Geometry, simplify
 
 
 class TestGeoRssFeed(unittest.TestCase):
@@ -55,3 +56,85 @@ class TestGeoRssFeed(unittest.TestCase):
                 "Feed output does not contain feed item coordinate."
         assert str(point.coords[1]) in feed_str, \
                 "Feed output does not contain feed item coordinate."
+
+
+class TestGeoRssCoords(unittest.TestCase):
+
+    def _get_feed(self):
+        return GeoRSSFeed(u'title', u'/link/', u'description')
+
+    def test_coords_order_and_precision(self):
+        feed = self._get_feed()
+        coords = ((-122.271116, 37.804359), (-122.0, 37.5))
+        self.assertEqual(feed.georss_coords(coords),
+                         u'37.804359 -122.271116 37.500000 -122.000000')
+        feed.coords_precision = 2
+        self.assertEqual(feed.georss_coords(array('d', [-122.271116, 37.804359])),
+                         u'37.80 -122.27')
+        feed.is_input_latitude_first = True
+        self.assertEqual(feed.georss_coords(coords),
+                         u'-122.27 37.80 -122.00 37.50')
+
+    def test_simplify(self):
+        # A nearly straight line with one far outlier.
+        line = array('d', [0, 0, 1, 0.01, 2, -0.01, 3, 5, 4, 0.01, 5, 0])
+        self.assertEqual(list(simplify(line, 0.1)), [0, 0, 2, -0.01, 3, 5,
+                                                     4, 0.01, 5, 0])
+        self.assertEqual(list(simplify(line, 10)), [0, 0, 5, 0])
+        self.assertIs(simplify(line, None), line)
+
+    def test_simplified_line_element(self):
+        feed = self._get_feed()
+        feed.simplify_tolerance = 0.1
+        feed.add_entry(u'title', u'/link/', u'description',
+                       geometry=Geometry('linestring',
+                                         [(0, 0), (1, 0.01), (2, 0)]))
+        self.assertIn('<georss:line>0.000000 0.000000 0.000000 2.000000'
+                      '</georss:line>', feed.write_string())
+
+
+class TestGeometry(unittest.TestCase):
+
+    def test_constructor(self):
+        self.assertEqual(Geometry('point', (1, 2)).flat, array('d', [1, 2]))
+        line = Geometry('linestring', '1 2  3 4')
+        self.assertEqual(line.flat, array('d', [1, 2, 3, 4]))
+        self.assertEqual(Geometry('linestring', [(1, 2), (3, 4)]).coords,
+                         line.coords)
+        flat = array('d', [1, 2, 3, 4])
+        self.assertIs(Geometry('linearring', flat).flat, flat)
+        polygon = Geometry('polygon', ['0 0 1 0 1 1 0 0', [(0, 0), (1, 1)]])
+        self.assertEqual(polygon.coords[1], array('d', [0, 0, 1, 1]))
+        self.assertIs(polygon.flat, polygon.rings[0])
+
+    def test_from_wkt(self):
+        point = Geometry.from_wkt('POINT (-122.271116 37.804359)')
+        self.assertEqual(point.geom_type, 'point')
+        self.assertEqual(point.flat, array('d', [-122.271116, 37.804359]))
+        polygon = Geometry.from_wkt(
+            'polygon ((0 0, 10 0, 10 10, 0 0), (1 1, 2 1, 2 2, 1 1))')
+        self.assertEqual(len(polygon.rings), 2)
+        self.assertEqual(polygon.flat,
+                         array('d', [0, 0, 10, 0, 10, 10, 0, 0]))
+        line = Geometry.from_wkt('LINESTRING(1e2 -2.5,3 .5)')
+        self.assertEqual(line.flat, array('d', [100, -2.5, 3, 0.5]))
+        self.assertRaises(ValueError, Geometry.from_wkt, 'POINT Z (1 2 3)')
+
+    def test_from_geojson(self):
+        line = Geometry.from_geojson(
+            '{"type": "LineString", "coordinates": [[1, 2], [3, 4, 5]]}')
+        self.assertEqual(line.geom_type, 'linestring')
+        self.assertEqual(line.flat, array('d', [1, 2, 3, 4]))
+        polygon = Geometry.from_geojson(
+            {'type': 'Polygon', 'coordinates': [[[0, 0], [1, 0], [0, 0]]]})
+        self.assertEqual(polygon.flat, array('d', [0, 0, 1, 0, 0, 0]))
+        self.assertRaises(ValueError, Geometry.from_geojson,
+                          {'type': 'MultiPoint', 'coordinates': []})
+
+    def test_polygon_element(self):
+        feed = GeoRSSFeed(u'title', u'/link/', u'description')
+        feed.add_entry(u'title', u'/link/', u'description',
+                       geometry=Geometry.from_wkt('POLYGON ((0 0, 1 0, 0 0))'))
+        self.assertIn('<georss:polygon>0.000000 0.000000 0.000000 1.000000 '
+                      '0.000000 0.000000</georss:polygon>',
+                      feed.write_string())
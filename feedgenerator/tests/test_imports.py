@@ -0,0 +1,52 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+SCRIPT = '''
+import json, sys, time
+before = set(sys.modules)
+start = time.time()
+import feedgenerator
+elapsed = time.time() - start
+print(json.dumps({
+    'elapsed': elapsed,
+    'modules': [name for name in set(sys.modules) - before
+                if sys.modules[name] is not None],
+}))
+'''
+
+
+class TestImportCost(unittest.TestCase):
+
+    # Generous, so that only a regression fails it.
+    max_seconds = 0.25
+    max_modules = 25
+    lazy_modules = ('uuid', 'json', 'urlparse', 'urllib', 'decimal',
+                    'hashlib', 'xml.sax.saxutils')
+
+    def _import(self):
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))))
+        output = subprocess.check_output([sys.executable, '-c', SCRIPT],
+                                         cwd=root)
+        return json.loads(output)
+
+    def test_lazy_modules(self):
+        modules = self._import()['modules']
+        for name in self.lazy_modules:
+            self.assertNotIn(name, modules)
+
+    def test_budget(self):
+        result = self._import()
+        self.assertLessEqual(len(result['modules']), self.max_modules,
+                             sorted(result['modules']))
+        self.assertLess(result['elapsed'], self.max_seconds)
+
+    def test_features(self):
+        # The lazily imported modules are there when needed.
+        import feedgenerator
+        self.assertTrue(feedgenerator.new_random_urn().startswith(u'urn:uuid:'))
+        self.assertTrue(feedgenerator.get_tag_uri(
+            u'http://example.org/a', None).startswith(u'tag:example.org'))
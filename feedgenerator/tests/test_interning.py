@@ -0,0 +1,45 @@
+import unittest
+from datetime import datetime
+from feedgenerator.generator import Atom1Feed, Rss201rev2Feed
+from feedgenerator.utils.interning import InternPool
+
+
+class TestInternPool(unittest.TestCase):
+
+    def test_intern(self):
+        pool = InternPool()
+        first = pool.intern([{'name': u'Jane', 'uri': u'/jane'}])
+        second = pool.intern(({'uri': u'/jane', 'name': u'Jane'},))
+        self.assertIs(first, second)
+        self.assertEqual(first, ({'name': u'Jane', 'uri': u'/jane'},))
+        self.assertIs(pool.intern(u'Jane'), first[0]['name'])
+        self.assertIsNot(pool.intern([{'name': u'John'}]), first)
+        # Unhashable values are passed through.
+        value = [set()]
+        self.assertIs(pool.intern(value), value)
+
+    def test_atom_entries_share_values(self):
+        feed = Atom1Feed(title=u'Feed Generator Updates',
+                         updated=datetime(2013, 5, 1))
+        expected = feed.with_entries([])
+        feed.intern_pool = InternPool()
+        for target in (feed, expected):
+            for i in range(2):
+                target.add_entry(title=u'Release %d' % i, id=u'urn:%d' % i,
+                                 updated=datetime(2013, 4, 1),
+                                 author=u'Twilight Sparkle',
+                                 categories=[{'term': u'releases'}])
+        self.assertIs(feed[0]['authors'], feed[1]['authors'])
+        self.assertIs(feed[0]['categories'], feed[1]['categories'])
+        self.assertIsNot(expected[0]['authors'], expected[1]['authors'])
+        self.assertEqual(feed.write_string(), expected.write_string())
+
+    def test_rss_entries_share_values(self):
+        feed = Rss201rev2Feed(u'title', u'/link/', u'description')
+        feed.intern_pool = InternPool()
+        feed.add_entries(*[{'title': u'Entry', 'link': u'/entry/%d' % i,
+                            'description': u'', 'author_name': u'Jane',
+                            'categories': ['a', 'b']} for i in range(2)])
+        self.assertIs(feed[0]['categories'], feed[1]['categories'])
+        self.assertEqual(feed[0]['categories'], (u'a', u'b'))
+        self.assertIs(feed[0]['author_name'], feed[1]['author_name'])
@@ -0,0 +1,75 @@
+# -*- encoding: utf-8 -*-
+import json
+import unittest
+from datetime import datetime
+from feedgenerator.generator import JsonFeed
+
+
+class TestJsonFeed(unittest.TestCase):
+
+    feed_kwargs = {
+        'title': u'Feed Generator Updates',
+        'subtitle': u'Updates about releases of the feedgenerator package.',
+        'link': u'https://github.com/ametaireau/feedgenerator/feed.json',
+        'links': [{'href': u'https://github.com/ametaireau/feedgenerator'}]}
+
+    feed_item_kwargs = {
+        'title': u'New Release – ünïcode',
+        'link': u'https://github.com/ametaireau/feedgenerator',
+        'authors': [{'name': u'Twilight Sparkle'}],
+        'summary': {'text': u'Release notes for the feed generator.'},
+        'content': {'text': u'Content with <strong>bold</strong> text.',
+                    'type': 'html'},
+        'categories': [{'term': u'release'}],
+        'updated': datetime(2013, 4, 1, 12, 0)}
+
+    def test_feed(self):
+        feed = JsonFeed(**self.feed_kwargs)
+        data = json.loads(feed.write_string('utf-8'))
+        self.assertEqual(data['version'], JsonFeed.version)
+        self.assertEqual(data['title'], self.feed_kwargs['title'])
+        self.assertEqual(data['description'], self.feed_kwargs['subtitle'])
+        self.assertEqual(data['feed_url'], self.feed_kwargs['link'])
+        self.assertEqual(data['home_page_url'],
+                         self.feed_kwargs['links'][0]['href'])
+        self.assertEqual(data['items'], [])
+
+    def test_feed_item(self):
+        feed = JsonFeed([self.feed_item_kwargs] * 2, **self.feed_kwargs)
+        data = json.loads(feed.write_string('utf-8').decode('utf-8'))
+        self.assertEqual(len(data['items']), 2)
+        item = data['items'][0]
+        self.assertEqual(item['title'], self.feed_item_kwargs['title'])
+        self.assertEqual(item['url'], self.feed_item_kwargs['link'])
+        self.assertEqual(item['content_html'],
+                         self.feed_item_kwargs['content']['text'])
+        self.assertEqual(item['summary'],
+                         self.feed_item_kwargs['summary']['text'])
+        self.assertEqual(item['date_modified'], u'2013-04-01T12:00:00Z')
+        self.assertEqual(item['authors'], [{'name': u'Twilight Sparkle'}])
+        self.assertEqual(item['tags'], [u'release'])
+
+    def test_attachment_sizes(self):
+        links = [{'href': u'http://example.com/%s.mp3' % length,
+                  'rel': 'enclosure', 'type': u'audio/mpeg',
+                  'length': length}
+                 for length in (u'1234', 5678, u'', u'unknown', None)]
+        feed = JsonFeed([dict(self.feed_item_kwargs, links=links)],
+                        **self.feed_kwargs)
+        data = json.loads(feed.write_string('utf-8').decode('utf-8'))
+        self.assertEqual([attachment.get('size_in_bytes') for attachment
+                          in data['items'][0]['attachments']],
+                         [1234, 5678, None, None, None])
+
+    def test_byte_strings(self):
+        # Byte strings are in the output encoding, as in the XML formats.
+        feed = JsonFeed(title='Caf\xc3\xa9', author='Twilight Sparkle')
+        feed.add_entry(title='Caf\xc3\xa9 2', updated=datetime(2013, 4, 1),
+                       content={'text': 'Cr\xc3\xa8me', 'type': u'html'})
+        data = json.loads(feed.write_string('utf-8').decode('utf-8'))
+        self.assertEqual(data['title'], u'Café')
+        self.assertEqual(data['items'][0]['title'], u'Café 2')
+        self.assertEqual(data['items'][0]['content_html'], u'Crème')
+        feed = JsonFeed(title='Caf\xe9', author=u'Twilight Sparkle')
+        data = json.loads(feed.write_string('iso-8859-1').decode('iso-8859-1'))
+        self.assertEqual(data['title'], u'Café')
@@ -0,0 +1,86 @@
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+from feedgenerator.__main__ import main, parse_date
+
+
+class TestMain(unittest.TestCase):
+
+    definitions = [
+        {'output': 'news.atom',
+         'feed': {'title': u'News', 'link': u'http://example.org/'},
+         'entries': [{'title': u'Hello', 'author': u'Twilight Sparkle',
+                      'updated': u'2013-04-01T12:00:00Z'}]},
+        {'output': 'news.rss', 'format': 'rss',
+         'feed': {'title': u'News', 'link': u'http://example.org/',
+                  'description': u'All the news.'},
+         'entries': [{'title': u'Hello', 'link': u'http://example.org/1',
+                      'description': u'Greetings.',
+                      'pubdate': u'2013-04-01 14:00+02:00'}]},
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.input = os.path.join(self.directory, 'feeds.jsonl')
+        with open(self.input, 'w') as fp:
+            for definition in self.definitions:
+                fp.write(json.dumps(definition) + '\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _run(self, *args):
+        stdout = StringIO()
+        status = main(['-o', self.directory] + list(args) + [self.input],
+                      stdout)
+        return status, stdout.getvalue()
+
+    def test_build(self):
+        for jobs in ('1', '2'):
+            status, output = self._run('-j', jobs)
+            self.assertEqual(status, 0)
+            self.assertIn('2 feeds built, 0 failed', output)
+            with open(os.path.join(self.directory, 'news.atom')) as fp:
+                self.assertIn('<title>Hello</title>', fp.read())
+            with open(os.path.join(self.directory, 'news.rss')) as fp:
+                self.assertIn('Mon, 01 Apr 2013 12:00:00 -0000', fp.read())
+
+    def test_relative_output_dir(self):
+        with open(self.input, 'a') as fp:
+            fp.write(json.dumps(dict(self.definitions[0],
+                                     output='atom/news.atom')) + '\n')
+        cwd = os.getcwd()
+        os.chdir(self.directory)
+        try:
+            for args in ([], ['-o', '.'], ['-o', './'], ['-o', 'out']):
+                stdout = StringIO()
+                self.assertEqual(main(args + [self.input], stdout), 0,
+                                 stdout.getvalue())
+                directory = args[-1] if args else '.'
+                self.assertTrue(os.path.exists(
+                    os.path.join(directory, 'atom', 'news.atom')))
+                self.assertTrue(os.path.exists(
+                    os.path.join(directory, 'news.rss')))
+        finally:
+            os.chdir(cwd)
+
+    def test_failures_are_reported(self):
+        with open(self.input, 'a') as fp:
+            fp.write(json.dumps({'output': '../escape.atom',
+                                 'feed': {'title': u'News'}}) + '\n')
+            fp.write('not json\n')
+        status, output = self._run()
+        self.assertEqual(status, 1)
+        self.assertIn('FAILED ../escape.atom', output)
+        self.assertIn('FAILED line 4', output)
+
+    def test_parse_date(self):
+        self.assertEqual(parse_date('2013-04-01'),
+                         datetime.datetime(2013, 4, 1))
+        self.assertEqual(parse_date('2013-04-01T12:00:00.5-01:30'),
+                         datetime.datetime(2013, 4, 1, 13, 30, 0, 500000))
+        self.assertRaises(ValueError, parse_date, 'yesterday')
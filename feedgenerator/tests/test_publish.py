@@ -0,0 +1,75 @@
+import gzip
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from datetime import datetime
+from feedgenerator.generator import Atom1Feed
+from feedgenerator.publish import publish
+
+
+class TestPublish(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'feed.atom')
+        self.feed = Atom1Feed(title=u'Feed Generator Updates',
+                              author=u'Twilight Sparkle',
+                              updated=datetime(2013, 5, 1))
+        self.feed.add_entry(title=u'Release 1', updated=datetime(2013, 4, 1))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _read(self, path):
+        with open(path, 'rb') as fp:
+            return fp.read()
+
+    def test_publishes_plain_and_gzipped(self):
+        self.assertEqual(publish(self.feed, self.path), 1)
+        full = self.feed.write_string()
+        self.assertEqual(self._read(self.path), full)
+        with gzip.open(self.path + '.gz') as fp:
+            self.assertEqual(fp.read(), full)
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         ['.feed.atom.fingerprint', 'feed.atom', 'feed.atom.gz'])
+        for path in (self.path, self.path + '.gz'):
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0644)
+
+    def test_skips_unchanged_feeds(self):
+        publish(self.feed, self.path)
+        inode = os.stat(self.path).st_ino
+        self.assertEqual(publish(self.feed, self.path), None)
+        self.assertEqual(os.stat(self.path).st_ino, inode)
+        self.assertEqual(publish(self.feed, self.path, force=True), 1)
+        self.assertNotEqual(os.stat(self.path).st_ino, inode)
+        self.feed.add_entry(title=u'Release 2', updated=datetime(2013, 4, 2))
+        self.assertEqual(publish(self.feed, self.path), 2)
+        self.assertEqual(self._read(self.path), self.feed.write_string())
+        os.unlink(self.path + '.gz')
+        self.assertEqual(publish(self.feed, self.path), 2)
+        self.assertEqual(publish(self.feed, self.path, 'iso-8859-1'), 2)
+
+    def test_without_compression(self):
+        publish(self.feed, self.path, compress=False)
+        self.assertFalse(os.path.exists(self.path + '.gz'))
+        self.assertEqual(publish(self.feed, self.path), 1)
+        self.assertTrue(os.path.exists(self.path + '.gz'))
+
+    def test_stops_compressing(self):
+        publish(self.feed, self.path)
+        self.feed.add_entry(title=u'Release 2', updated=datetime(2013, 4, 2))
+        self.assertEqual(publish(self.feed, self.path, compress=False), 2)
+        self.assertFalse(os.path.exists(self.path + '.gz'))
+        self.assertEqual(self._read(self.path), self.feed.write_string())
+        self.assertEqual(publish(self.feed, self.path, compress=False), None)
+
+    def test_failed_publish_keeps_old_files(self):
+        publish(self.feed, self.path)
+        old = self._read(self.path)
+        self.feed.add_entry(title=u'Broken', updated=u'not a date')
+        self.assertRaises(Exception, publish, self.feed, self.path)
+        self.assertEqual(self._read(self.path), old)
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         ['.feed.atom.fingerprint', 'feed.atom', 'feed.atom.gz'])
@@ -65,3 +65,19 @@ class TestRssFeed(unittest.TestCase):
         title_str = item_input_kwargs['title'].encode(encoding)
         assert title_str in feed.write_string(encoding), \
                 "Feed output does not contain feed item title."
+
+    def test_add_entries(self):
+        input_kwargs = self._get_feed_kwargs()
+        item_input_kwargs = self._get_feed_item_kwargs()
+        single = self._get_Rss201rev2Feed(input_kwargs)
+        single.add_entry(**item_input_kwargs)
+        single.add_entry('Caf\xc3\xa9', u'/caf\xe9', 'Bytes', ttl=5,
+                         categories=['a', u'b'], comments=None)
+        bulk = self._get_Rss201rev2Feed(input_kwargs)
+        bulk.add_entries(item_input_kwargs,
+                         ('Caf\xc3\xa9', u'/caf\xe9', 'Bytes', None, None,
+                          None, None, None, None, None, ['a', u'b'], None, 5))
+        self.assertEqual(list(bulk), list(single))
+        self.assertEqual(bulk[1]['link'], '/caf%C3%A9')
+        self.assertEqual(bulk[1]['ttl'], u'5')
+        self.assertRaises(TypeError, bulk.add_entries, {'title': u'Title'})
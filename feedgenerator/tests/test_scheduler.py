@@ -0,0 +1,74 @@
+import os
+import shutil
+import stat
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from feedgenerator.generator import Rss201rev2Feed
+from feedgenerator.scheduler import ObservableFeedMixin, RenderScheduler
+
+
+class ObservableRssFeed(ObservableFeedMixin, Rss201rev2Feed):
+    pass
+
+
+class TestRenderScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.renders = []
+        self.feed = ObservableRssFeed(u'title', u'/link/', u'description')
+
+    def _add_entries(self, count):
+        for i in range(count):
+            self.feed.add_entry(u'Entry %d' % i, u'/entry/%d' % i, u'',
+                                pubdate=datetime(2013, 4, 1))
+
+    def test_coalesces_bursts(self):
+        scheduler = RenderScheduler(quiet=0.1)
+        scheduler.add(self.feed, self.renders.append)
+        try:
+            self._add_entries(300)
+            deadline = time.time() + 5
+            while not self.renders and time.time() < deadline:
+                time.sleep(0.02)
+            time.sleep(0.2)
+            self.assertEqual(len(self.renders), 1)
+            self.assertEqual(self.renders[0].count('<entry>'), 300)
+        finally:
+            scheduler.close()
+
+    def test_flush(self):
+        scheduler = RenderScheduler(quiet=60)
+        scheduler.add(self.feed, self.renders.append)
+        self._add_entries(3)
+        self.feed.add_entries((u'Entry 3', u'/entry/3', u''))
+        self.assertEqual(scheduler.pending(), 1)
+        self.assertEqual(scheduler.flush(), 1)
+        self.assertEqual(scheduler.flush(), 0)
+        scheduler.close()
+        self.assertEqual(self.renders, [self.feed.write_string()])
+
+    def test_publishes_files_atomically(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'feed.rss')
+            scheduler = RenderScheduler(quiet=60)
+            scheduler.add(self.feed, path)
+            scheduler.changed(self.feed)
+            scheduler.close()
+            with open(path, 'rb') as fp:
+                self.assertEqual(fp.read(), self.feed.write_string())
+            self.assertEqual(os.listdir(directory), ['feed.rss'])
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0644)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_removed_feeds_are_not_rendered(self):
+        scheduler = RenderScheduler(quiet=60)
+        scheduler.add(self.feed, self.renders.append)
+        self._add_entries(1)
+        scheduler.remove(self.feed)
+        self.assertEqual(self.feed.observers, [])
+        scheduler.close()
+        self.assertEqual(self.renders, [])
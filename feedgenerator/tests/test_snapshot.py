@@ -0,0 +1,65 @@
+import unittest
+from StringIO import StringIO
+from datetime import datetime
+from feedgenerator import snapshot
+from feedgenerator.contrib.gis.feeds import GeoRSSFeed
+from feedgenerator.generator import (Atom1Feed, Enclosure, Rss201rev2Feed,
+    SyndicationFeed)
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def _get_atom_feed(self):
+        feed = Atom1Feed(title=u'Feed Generator Updates',
+                         link=u'https://github.com/ametaireau/feedgenerator',
+                         updated=datetime(2013, 5, 1))
+        feed.add_entry(title=u'New Release', author=u'Twilight Sparkle',
+                       updated=datetime(2013, 4, 1))
+        return feed
+
+    def test_atom_round_trip(self):
+        feed = self._get_atom_feed()
+        for compress in (False, True):
+            restored = snapshot.loads(snapshot.dumps(feed, compress))
+            self.assertIs(type(restored), Atom1Feed)
+            self.assertEqual(restored.meta, feed.meta)
+            self.assertEqual(list(restored), list(feed))
+            # Unpickled dicts may iterate in another order, so only the
+            # length of the output is compared.
+            self.assertEqual(len(restored.write_string()),
+                             len(feed.write_string()))
+
+    def test_rss_round_trip_through_file(self):
+        feed = Rss201rev2Feed(u'title', u'/link/', u'description')
+        feed.add_entry(u'title', u'/link/', u'description',
+                       pubdate=datetime(2013, 4, 1),
+                       enclosure=Enclosure(u'/a.mp3', u'1', u'audio/mpeg'))
+        fp = StringIO()
+        snapshot.dump(feed, fp)
+        fp.seek(0)
+        restored = snapshot.load(fp)
+        self.assertEqual(restored.write_string(), feed.write_string())
+
+    def test_rejects_garbage(self):
+        self.assertRaises(snapshot.SnapshotError, snapshot.loads, 'garbage')
+
+    def test_from_prepared_skips_preparation(self):
+        feed = self._get_atom_feed()
+        restored = Atom1Feed.from_prepared(feed.meta, feed)
+        self.assertIsInstance(restored, SyndicationFeed)
+        self.assertEqual(restored.write_string(), feed.write_string())
+
+    def test_settings_round_trip(self):
+        feed = GeoRSSFeed(u'title', u'/link/', u'description')
+        feed.coords_precision = 2
+        feed.is_input_latitude_first = True
+        feed.add_entry(u'title', u'/link/', u'description',
+                       pubdate=datetime(2013, 4, 1),
+                       geometry=(1.23456, 2.34567))
+        restored = snapshot.loads(snapshot.dumps(feed))
+        self.assertEqual(restored.coords_precision, 2)
+        self.assertTrue(restored.is_input_latitude_first)
+        self.assertEqual(restored.render_key(), feed.render_key())
+        self.assertEqual(restored.write_string(), feed.write_string())
+        self.assertIn('<georss:point>2.35 1.23</georss:point>',
+                      restored.write_string())
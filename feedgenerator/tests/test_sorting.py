@@ -0,0 +1,77 @@
+import random
+import unittest
+from StringIO import StringIO
+from datetime import datetime, timedelta
+from feedgenerator.generator import Rss201rev2Feed
+from feedgenerator.sorting import ExternalSort, entry_date, write_sorted
+
+
+class TestExternalSort(unittest.TestCase):
+
+    def _get_entries(self, count=300):
+        rng = random.Random(1)
+        return [{'title': u'Entry %d' % i,
+                 'pubdate': datetime(2013, 1, 1)
+                            + timedelta(days=rng.randrange(60))}
+                for i in xrange(count)]
+
+    def test_in_memory(self):
+        entries = self._get_entries()
+        entries_sort = ExternalSort()
+        entries_sort.extend(entries)
+        self.assertEqual(entries_sort._runs(), [])
+        self.assertEqual(list(entries_sort),
+                         sorted(entries, key=entry_date, reverse=True))
+
+    def test_spills_and_merges_stably(self):
+        entries = self._get_entries()
+        for reverse in (True, False):
+            entries_sort = ExternalSort(reverse=reverse, memory_bytes=1000,
+                                        merge_width=4)
+            entries_sort.extend(entries)
+            try:
+                self.assertGreater(len(entries_sort._levels), 1)
+                for runs in entries_sort._levels:
+                    self.assertLess(len(runs), 4)
+                self.assertEqual(len(entries_sort), len(entries))
+                self.assertEqual(
+                    list(entries_sort),
+                    sorted(entries, key=entry_date, reverse=reverse))
+                self.assertEqual(entries_sort.latest['pubdate'],
+                                 max(entry_date(e) for e in entries))
+            finally:
+                entries_sort.close()
+
+    def test_merges_in_tiers(self):
+        written = []
+
+        class CountingSort(ExternalSort):
+            def _new_run(self, entries):
+                entries = list(entries)
+                written.append(len(entries))
+                return super(CountingSort, self)._new_run(entries)
+
+        entries = self._get_entries(1024)
+        entries_sort = CountingSort(memory_bytes=1, merge_width=2)
+        try:
+            entries_sort.extend(entries)
+            # 1024 runs of one entry merged pairwise: written once as a run,
+            # then once per level of 10 merges.
+            self.assertEqual(sum(written), 1024 * 11)
+            self.assertEqual(list(entries_sort),
+                             sorted(entries, key=entry_date, reverse=True))
+        finally:
+            entries_sort.close()
+
+    def test_write_sorted(self):
+        entries = self._get_entries()
+        feed = Rss201rev2Feed(u'title', u'/link/', u'description')
+        for entry in entries:
+            feed.add_entry(entry['title'], u'/link/', u'',
+                           pubdate=entry['pubdate'])
+        expected = feed.with_entries(
+            sorted(feed, key=entry_date, reverse=True)).write_string()
+        out = StringIO()
+        write_sorted(feed.with_entries([]), list(feed), out,
+                     memory_bytes=2000)
+        self.assertEqual(out.getvalue(), expected)
@@ -0,0 +1,87 @@
+import unittest
+from datetime import datetime
+from feedgenerator.contrib.gis.feeds import GeoAtom1Feed, GeoRSSFeed
+from feedgenerator.contrib.gis.geometry import Geometry
+from feedgenerator.contrib.gis.index import GridIndex, bounds
+
+
+class TestGridIndex(unittest.TestCase):
+
+    def _get_pool(self):
+        pool = GeoRSSFeed(u'All', u'/all/', u'Everything')
+        pool.add_entry(u'Oakland', u'/1', u'', geometry=(-122.27, 37.80))
+        pool.add_entry(u'Berkeley', u'/2', u'', geometry=(-122.27, 37.87))
+        pool.add_entry(u'Paris', u'/3', u'', geometry=(2.35, 48.86))
+        pool.add_entry(u'Bay Bridge', u'/4', u'', geometry=Geometry(
+            'linestring', [(-122.39, 37.79), (-122.30, 37.81)]))
+        pool.add_entry(u'Nowhere', u'/5', u'')
+        return pool
+
+    def test_bounds(self):
+        self.assertEqual(bounds((1, 2)), (1, 2, 1, 2))
+        self.assertEqual(bounds((3, 4, 1, 2)), (1, 2, 3, 4))
+        self.assertEqual(bounds(((1, 2), (3, 4))), (1, 2, 3, 4))
+        self.assertEqual(bounds(Geometry('polygon', ['0 0 2 0 2 3 0 0'])),
+                         (0, 0, 2, 3))
+
+    def test_query(self):
+        index = GridIndex.from_feed(self._get_pool(), cell_size=0.1)
+        self.assertEqual(len(index.entries), 4)
+        titles = [entry['title'] for entry in
+                  index.entries_in((-122.35, 37.75, -122.2, 37.85))]
+        self.assertEqual(titles, [u'Oakland', u'Bay Bridge'])
+        self.assertEqual(index.entries_in((0, 0, 1, 1)), [])
+
+    def test_large_queries(self):
+        self.assertEqual(GridIndex(cell_size=0.01).query((0, 0, 36, 18)), [])
+        index = GridIndex.from_feed(self._get_pool(), cell_size=0.01)
+        titles = [entry['title'] for entry in
+                  index.entries_in((-180, -90, 180, 90))]
+        self.assertEqual(titles,
+                         [u'Oakland', u'Berkeley', u'Paris', u'Bay Bridge'])
+        titles = [entry['title'] for entry in
+                  index.entries_in((-123, 37.8, -122.27, 38))]
+        self.assertEqual(titles, [u'Oakland', u'Berkeley', u'Bay Bridge'])
+        self.assertEqual(index.query((-100, -90, 0, 90)), [])
+
+    def test_large_entries(self):
+        pool = self._get_pool()
+        cells = len(GridIndex.from_feed(pool, cell_size=0.01).cells)
+        pool.add_entry(u'Route 66', u'/6', u'', geometry=Geometry(
+            'linestring', [(-118.49, 34.01), (-87.62, 41.88)]))
+        index = GridIndex.from_feed(pool, cell_size=0.01)
+        self.assertEqual(index.large, [4])
+        self.assertEqual(len(index.cells), cells)
+        titles = [entry['title'] for entry in
+                  index.entries_in((-100, 35, -99, 36))]
+        self.assertEqual(titles, [u'Route 66'])
+        titles = [entry['title'] for entry in
+                  index.entries_in((-123, 37.8, -90, 38))]
+        self.assertEqual(titles,
+                         [u'Oakland', u'Berkeley', u'Bay Bridge', u'Route 66'])
+        self.assertEqual(index.query((0, 0, 1, 1)), [])
+
+    def test_fill_rss(self):
+        index = GridIndex.from_feed(self._get_pool(), cell_size=0.5)
+        feed = GeoRSSFeed(u'Bay Area', u'/bay/', u'News')
+        self.assertEqual(index.fill(feed, (-123, 37, -122, 38)), 3)
+        self.assertEqual(feed.meta['geometry'],
+                         (-122.39, 37.79, -122.27, 37.87))
+        self.assertIn(u'<georss:box>37.790000 -122.390000 37.870000 '
+                      u'-122.270000</georss:box>', feed.write_string())
+
+    def test_fill_atom(self):
+        pool = GeoAtom1Feed(title=u'All', author=u'Twilight Sparkle')
+        pool.add_entry(title=u'Paris', updated=datetime(2013, 4, 1),
+                       geometry=(2.35, 48.86))
+        pool.add_entry(title=u'Oakland', updated=datetime(2013, 4, 1),
+                       geometry=(-122.27, 37.80))
+        feed = GeoAtom1Feed(title=u'France', author=u'Twilight Sparkle')
+        GridIndex.from_feed(pool).fill(feed, (-5, 41, 10, 51))
+        output = feed.write_string()
+        self.assertIn(u'<title>Paris</title>', output)
+        self.assertNotIn(u'Oakland', output)
+        self.assertIn(u'<georss:point>48.860000 2.350000</georss:point>',
+                      output)
+        self.assertIn(u'<georss:box>48.860000 2.350000 48.860000 2.350000'
+                      u'</georss:box>', output)
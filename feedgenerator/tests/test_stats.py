@@ -0,0 +1,85 @@
+import unittest
+from StringIO import StringIO
+from datetime import datetime
+from feedgenerator.generator import Atom1Feed, JsonFeed, Rss201rev2Feed
+from feedgenerator.stats import RenderStats
+
+
+class TestRenderStats(unittest.TestCase):
+
+    def _get_feed(self):
+        feed = Atom1Feed(title=u'Feed Generator Updates',
+                         author=u'Twilight Sparkle',
+                         updated=datetime(2013, 5, 1))
+        for i in range(5):
+            feed.add_entry(title=u'Release %d' % i,
+                           updated=datetime(2013, 4, i + 1))
+        return feed
+
+    def test_stats_do_not_change_output(self):
+        feed = self._get_feed()
+        for max_bytes in (None, len(feed.write_string()) - 200):
+            plain, instrumented = StringIO(), StringIO()
+            count = feed.write(plain, 'utf-8', max_bytes=max_bytes)
+            stats = RenderStats()
+            self.assertEqual(feed.write(instrumented, 'utf-8', stats=stats,
+                                        max_bytes=max_bytes), count)
+            self.assertEqual(plain.getvalue(), instrumented.getvalue())
+            self.assertEqual(stats.entry_count, count)
+        self.assertLess(count, len(feed))
+        self.assertNotIn('get_handler', feed.__dict__)
+
+    def test_counts_and_phases(self):
+        feed = self._get_feed()
+        stats = RenderStats(slowest=2)
+        output = StringIO()
+        feed.write(output, 'utf-8', stats=stats)
+        self.assertEqual(stats.entry_count, 5)
+        self.assertEqual(stats.byte_count, len(output.getvalue()))
+        self.assertEqual(sorted(stats.phases),
+                         ['end', 'entries', 'root_elements', 'start'])
+        self.assertEqual(sorted(stats.steps), ['date_formatting', 'encoding'])
+        self.assertEqual(len(stats.slowest_entries), 2)
+        seconds, entry = stats.slowest_entries[0]
+        self.assertIn(entry, feed)
+
+    def test_callbacks(self):
+        feed = Rss201rev2Feed(u'title', u'/link/', u'description')
+        feed.add_entry(u'title', u'/link/', u'description')
+        entries, phases = [], []
+        stats = RenderStats(
+            on_entry_rendered=lambda entry, seconds: entries.append(entry),
+            on_phase_done=lambda name, seconds: phases.append(name))
+        with stats.phase('prepare'):
+            pass
+        feed.write(StringIO(), stats=stats)
+        self.assertEqual(entries, list(feed))
+        self.assertEqual(phases,
+                         ['prepare', 'start', 'root_elements', 'entries', 'end'])
+
+    def test_steps(self):
+        feed = Rss201rev2Feed(u'title', u'/link/', u'description')
+        stats = RenderStats()
+        with stats.instrument(feed):
+            feed.add_entry(u'title', u'/link/', u'description',
+                           pubdate=datetime(2013, 4, 1))
+        self.assertEqual(sorted(stats.steps), ['uri_escaping'])
+        feed.write(StringIO(), stats=stats)
+        self.assertEqual(sorted(stats.steps),
+                         ['date_formatting', 'encoding', 'uri_escaping'])
+        stats = RenderStats()
+        JsonFeed(title=u'title').write(StringIO(), stats=stats)
+        self.assertIn('encoding', stats.steps)
+
+    def test_uses_write_entries_of_subclasses(self):
+        class ReversedFeed(Atom1Feed):
+            def write_entries(self, handler, entries=None, max_bytes=None):
+                return super(ReversedFeed, self).write_entries(
+                    handler, reversed(list(entries or self)), max_bytes)
+
+        feed = ReversedFeed(title=u'Feed', author=u'A',
+                            updated=datetime(2013, 5, 1))
+        feed.extend(self._get_feed())
+        output = StringIO()
+        feed.write(output, stats=RenderStats())
+        self.assertEqual(output.getvalue(), feed.write_string())
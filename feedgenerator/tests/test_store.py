@@ -0,0 +1,103 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from StringIO import StringIO
+from datetime import datetime
+from feedgenerator.contrib.gis.feeds import GeoRSSFeed
+from feedgenerator.generator import Rss201rev2Feed
+from feedgenerator.store import FeedStore, StoreError
+
+
+class TestFeedStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = FeedStore(':memory:')
+        self.feed = Rss201rev2Feed(u'title', u'/link/', u'description')
+        for day in (3, 1, 4, 2, 5):
+            self.feed.add_entry(u'Entry %d' % day, u'/entry/%d' % day, u'',
+                                pubdate=datetime(2013, 4, day))
+        self.store.save('news', self.feed)
+
+    def tearDown(self):
+        self.store.close()
+
+    def _titles(self, entries):
+        return [entry['title'] for entry in entries]
+
+    def test_newest_first(self):
+        self.assertEqual(self.store.count('news'), 5)
+        self.assertEqual(self._titles(self.store.entries('news', limit=2)),
+                         [u'Entry 5', u'Entry 4'])
+
+    def test_pages(self):
+        self.assertEqual(self._titles(self.store.entries('news', 2, 2)),
+                         [u'Entry 3', u'Entry 2'])
+        self.assertEqual(
+            self._titles(self.store.entries('news', 2, before=u'/entry/3')),
+            [u'Entry 2', u'Entry 1'])
+
+    def test_upsert_and_delete(self):
+        entry = dict(self.feed[0], title=u'Changed')
+        self.store.upsert('news', [entry])
+        self.assertEqual(self.store.count('news'), 5)
+        self.assertIn(u'Changed', self._titles(self.store.entries('news')))
+        self.store.delete('news', [u'/entry/3'])
+        self.assertEqual(self.store.count('news'), 4)
+        self.store.delete('news')
+        self.assertEqual(self.store.count('news'), 0)
+        self.assertRaises(StoreError, self.store.feed, 'news')
+
+    def test_write(self):
+        out = StringIO()
+        self.store.write('news', out, limit=3)
+        expected = self.feed.with_entries(
+            sorted(self.feed, key=lambda entry: entry['pubdate'],
+                   reverse=True)[:3])
+        self.assertEqual(out.getvalue(), expected.write_string())
+        self.assertEqual(self.store.feed('news', limit=3).write_string(),
+                         out.getvalue())
+
+    def test_settings(self):
+        feed = GeoRSSFeed(u'title', u'/link/', u'description')
+        feed.coords_precision = 2
+        feed.is_input_latitude_first = True
+        feed.add_entry(u'Entry', u'/entry/', u'', pubdate=datetime(2013, 4, 1),
+                       geometry=(1.23456, 2.34567))
+        self.store.save('places', feed)
+        stored = self.store.feed('places')
+        self.assertEqual(stored.coords_precision, 2)
+        self.assertTrue(stored.is_input_latitude_first)
+        out = StringIO()
+        self.store.write('places', out)
+        self.assertEqual(out.getvalue(), feed.write_string())
+        self.assertIn('<georss:point>2.35 1.23</georss:point>',
+                      out.getvalue())
+
+    def test_store_without_settings(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'feeds.db')
+            connection = sqlite3.connect(path)
+            connection.execute('CREATE TABLE feeds (name TEXT PRIMARY KEY,'
+                               ' module TEXT NOT NULL, class TEXT NOT NULL,'
+                               ' meta BLOB NOT NULL)')
+            connection.commit()
+            connection.close()
+            store = FeedStore(path)
+            store.save('news', self.feed)
+            self.assertEqual(len(store.feed('news')), 5)
+            # As saved before settings were stored.
+            store.connection.execute('UPDATE feeds SET settings = NULL')
+            self.assertEqual(len(store.feed('news')), 5)
+            store.close()
+        finally:
+            shutil.rmtree(directory)
+
+    def test_uses_date_index(self):
+        plan = self.store.connection.execute(
+            'EXPLAIN QUERY PLAN SELECT data FROM entries WHERE feed = ?'
+            ' ORDER BY updated DESC, id DESC LIMIT 10', ('news',)).fetchall()
+        self.assertIn('entries_updated', str(plan))
+        self.assertNotIn('TEMP B-TREE', str(plan))
@@ -0,0 +1,129 @@
+import unittest
+from datetime import datetime
+from wsgiref.util import setup_testing_defaults
+from wsgiref.validate import validator
+from feedgenerator.generator import Atom1Feed, Rss201rev2Feed
+from feedgenerator.wsgi import FeedApplication, last_modified
+
+
+class TestFeedApplication(unittest.TestCase):
+
+    def _get_feed(self):
+        feed = Atom1Feed(title=u'Feed Generator Updates',
+                         author=u'Twilight Sparkle')
+        feed.add_entry(title=u'New Release', updated=datetime(2013, 4, 1, 12))
+        return feed
+
+    def _request(self, application, method='GET', **headers):
+        environ = {'REQUEST_METHOD': method, 'QUERY_STRING': ''}
+        for name, value in headers.iteritems():
+            environ['HTTP_' + name.upper()] = value
+        setup_testing_defaults(environ)
+        response = {'body': []}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = status
+            response['headers'] = dict(headers)
+            return response['body'].append
+
+        body = validator(application)(environ, start_response)
+        response['body'].extend(body)
+        body.close()
+        response['body'] = ''.join(response['body'])
+        return response
+
+    def test_get(self):
+        feed = self._get_feed()
+        response = self._request(FeedApplication(feed))
+        self.assertEqual(response['status'], '200 OK')
+        self.assertEqual(response['headers']['Content-Type'], feed.mime_type)
+        self.assertEqual(response['headers']['Last-Modified'],
+                         'Mon, 01 Apr 2013 12:00:00 GMT')
+        self.assertEqual(response['headers']['ETag'],
+                         '"%s"' % feed.fingerprint())
+        self.assertIn('<title>New Release</title>', response['body'])
+        self.assertNotIn('Content-Length', response['headers'])
+
+    def test_body_is_returned(self):
+        application = FeedApplication(self._get_feed())
+        environ = {'REQUEST_METHOD': 'GET'}
+        setup_testing_defaults(environ)
+        written = []
+        body = application(environ, lambda status, headers: written.append)
+        self.assertEqual(written, [])
+        self.assertIn('<title>New Release</title>', ''.join(body))
+
+    def test_body_is_streamed(self):
+        written = []
+
+        class CountingFeed(Atom1Feed):
+            def write_entry(self, handler, entry):
+                written.append(entry)
+                super(CountingFeed, self).write_entry(handler, entry)
+
+        feed = CountingFeed(title=u'Feed Generator Updates',
+                            author=u'Twilight Sparkle',
+                            updated=datetime(2013, 5, 1))
+        feed.write_buffer_size = 256
+        for i in range(20):
+            feed.add_entry(title=u'Release %d' % i,
+                           updated=datetime(2013, 4, 1, i))
+        environ = {'REQUEST_METHOD': 'GET'}
+        setup_testing_defaults(environ)
+        body = FeedApplication(feed)(environ, lambda status, headers: None)
+        self.assertEqual(written, [])
+        blocks = [next(body)]
+        self.assertLess(len(written), 20)
+        blocks.extend(body)
+        self.assertEqual(len(written), 20)
+        self.assertTrue(all(len(block) <= 256 for block in blocks))
+        self.assertEqual(''.join(blocks), feed.write_string())
+
+    def test_headers_and_body_from_one_snapshot(self):
+        feed = self._get_feed()
+
+        class ChangingApplication(FeedApplication):
+            def content_type(self, served):
+                # Changes the feed after the headers were computed.
+                feed.add_entry(title=u'Late Release',
+                               updated=datetime(2013, 4, 2))
+                return super(ChangingApplication, self).content_type(served)
+
+        response = self._request(ChangingApplication(feed))
+        self.assertNotIn('Late Release', response['body'])
+        self.assertEqual(response['headers']['Last-Modified'],
+                         'Mon, 01 Apr 2013 12:00:00 GMT')
+
+    def test_head(self):
+        response = self._request(FeedApplication(self._get_feed()), 'HEAD')
+        self.assertEqual(response['status'], '200 OK')
+        self.assertEqual(response['body'], '')
+
+    def test_conditional_requests(self):
+        feed = self._get_feed()
+        application = FeedApplication(lambda: feed)
+        etag = self._request(application)['headers']['ETag']
+        response = self._request(application, if_none_match='"x", ' + etag)
+        self.assertEqual(response['status'], '304 Not Modified')
+        self.assertEqual(response['body'], '')
+        response = self._request(
+            application, if_modified_since='Mon, 01 Apr 2013 12:00:00 GMT')
+        self.assertEqual(response['status'], '304 Not Modified')
+        response = self._request(
+            application, if_modified_since='Mon, 01 Apr 2013 11:59:59 GMT')
+        self.assertEqual(response['status'], '200 OK')
+        feed.add_entry(title=u'Another Release',
+                       updated=datetime(2013, 4, 2))
+        response = self._request(application, if_none_match=etag)
+        self.assertEqual(response['status'], '200 OK')
+        self.assertIn('Another Release', response['body'])
+
+    def test_method_not_allowed(self):
+        response = self._request(FeedApplication(self._get_feed()), 'POST')
+        self.assertEqual(response['status'], '405 Method Not Allowed')
+
+    def test_last_modified(self):
+        feed = Rss201rev2Feed(u'title', u'/link/', u'description')
+        self.assertIs(last_modified(feed), None)
+        feed.add_entry(u'title', u'/link/', u'', pubdate=datetime(2013, 4, 1))
+        self.assertEqual(last_modified(feed), datetime(2013, 4, 1))
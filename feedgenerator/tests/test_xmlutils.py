@@ -0,0 +1,139 @@
+# -*- encoding: utf-8 -*-
+import gzip
+import hashlib
+import unittest
+from datetime import datetime
+from StringIO import StringIO
+from feedgenerator.generator import Atom1Feed, JsonFeed
+from feedgenerator.utils.writers import TeeWriter
+from feedgenerator.utils.xmlutils import CoalescingWriter, SimplerXMLGenerator
+
+
+class RecordingFile(object):
+
+    def __init__(self):
+        self.writes = []
+
+    def write(self, data):
+        self.writes.append(data)
+
+    def getvalue(self):
+        return ''.join(self.writes)
+
+
+class TestCoalescingWriter(unittest.TestCase):
+
+    def test_coalesces(self):
+        out = RecordingFile()
+        writer = CoalescingWriter(out, 8)
+        for data in ('abc', 'def', 'gh', 'i'):
+            writer.write(data)
+        self.assertEqual(out.writes, ['abcdefgh'])
+        writer.write('0123456789')
+        writer.write('j')
+        writer.flush()
+        self.assertEqual(out.writes, ['abcdefgh', 'i', '0123456789', 'j'])
+
+    def test_write_through(self):
+        out = RecordingFile()
+        writer = CoalescingWriter(out, 0)
+        writer.write('abc')
+        writer.write('def')
+        self.assertEqual(out.writes, ['abc', 'def'])
+
+    def test_mark_and_rollback(self):
+        out = RecordingFile()
+        writer = CoalescingWriter(out, 4)
+        writer.write('abc')
+        writer.mark()
+        writer.write('defghij')
+        self.assertEqual(writer.tell(), 10)
+        writer.rollback()
+        self.assertEqual(writer.tell(), 3)
+        writer.mark()
+        writer.write('de')
+        writer.release()
+        writer.write('f')
+        writer.flush()
+        self.assertEqual(out.getvalue(), 'abcdef')
+        self.assertEqual(writer.tell(), 6)
+
+    def test_incremental_encoding(self):
+        out = RecordingFile()
+        handler = SimplerXMLGenerator(out, 'utf-16', 1024)
+        handler.startDocument()
+        handler.addQuickElement(u'title', u'Ünïcode')
+        handler.endDocument()
+        self.assertEqual(
+            out.getvalue().decode('utf-16'),
+            u'<?xml version="1.0" encoding="utf-16"?>\n<title>Ünïcode</title>')
+
+    def test_feed_output_is_coalesced(self):
+        feed = Atom1Feed(title=u'Feed Generator Updates',
+                         author=u'Twilight Sparkle',
+                         updated=datetime(2013, 5, 1))
+        for i in range(100):
+            feed.add_entry(title=u'Release %d' % i,
+                           updated=datetime(2013, 4, 1))
+        out = RecordingFile()
+        feed.write(out, 'utf-8')
+        self.assertEqual(len(out.writes), 1)
+        self.assertEqual(out.getvalue(), feed.write_string('utf-8'))
+
+
+class TestMaxBytes(unittest.TestCase):
+
+    def _get_feed(self, cls=Atom1Feed):
+        feed = cls(title=u'Feed Generator Updates', author=u'Twilight Sparkle',
+                   updated=datetime(2013, 5, 1))
+        for i in range(50):
+            feed.add_entry(title=u'Release %d' % i,
+                           updated=datetime(2013, 4, 1))
+        return feed
+
+    def test_max_bytes(self):
+        for cls in (Atom1Feed, JsonFeed):
+            feed = self._get_feed(cls)
+            full = feed.write_string()
+            for max_bytes in (len(full), len(full) - 1, len(full) // 2, 0):
+                out = RecordingFile()
+                count = feed.write(out, 'utf-8', max_bytes=max_bytes)
+                output = out.getvalue()
+                expected = feed.with_entries(feed[:count]).write_string()
+                self.assertEqual(output, expected)
+                if count:
+                    self.assertLessEqual(len(output), max_bytes)
+                if count < len(feed):
+                    self.assertGreater(len(feed.with_entries(
+                        feed[:count + 1]).write_string()), max_bytes)
+            self.assertEqual(feed.write_string(max_bytes=len(full)), full)
+
+
+class TestTeeWriter(unittest.TestCase):
+
+    def test_writes_to_all_sinks(self):
+        out, digest = RecordingFile(), hashlib.sha256()
+        tee = TeeWriter([out, digest])
+        tee.write('<feed>')
+        tee.write('</feed>')
+        self.assertEqual(out.writes, ['<feed>', '</feed>'])
+        self.assertEqual(digest.hexdigest(),
+                         hashlib.sha256('<feed></feed>').hexdigest())
+
+    def test_one_render_to_many_sinks(self):
+        for cls in (Atom1Feed, JsonFeed):
+            feed = cls(title=u'Feed Generator Updates',
+                       author=u'Twilight Sparkle', updated=datetime(2013, 5, 1))
+            for i in range(50):
+                feed.add_entry(title=u'Release %d' % i,
+                               updated=datetime(2013, 4, 1))
+            out, gz_out, digest = RecordingFile(), StringIO(), hashlib.sha256()
+            gz_file = gzip.GzipFile(fileobj=gz_out, mode='wb')
+            self.assertEqual(feed.write([out, gz_file, digest]), 50)
+            gz_file.close()
+            full = feed.write_string()
+            self.assertEqual(out.getvalue(), full)
+            gz_out.seek(0)
+            self.assertEqual(gzip.GzipFile(fileobj=gz_out).read(), full)
+            self.assertEqual(digest.hexdigest(),
+                             hashlib.sha256(full).hexdigest())
@@ -1,10 +1,9 @@
 """
 Ported from django.utils.encoding.
 """
+import sys
 import types
-import urllib
 import datetime
-from decimal import Decimal
 from feedgenerator.utils.functional import Promise
 
 class DjangoUnicodeDecodeError(UnicodeDecodeError):
@@ -23,12 +22,16 @@ def is_protected_type(obj):
     Objects of protected types are preserved as-is when passed to
     force_unicode(strings_only=True).
     """
-    return isinstance(obj, (
+    if isinstance(obj, (
         types.NoneType,
         int, long,
         datetime.datetime, datetime.date, datetime.time,
-        float, Decimal)
-    )
+        float)
+    ):
+        return True
+    # There are no Decimals unless the decimal module has been imported.
+    decimal = sys.modules.get('decimal')
+    return decimal is not None and isinstance(obj, decimal.Decimal)
 
 def force_unicode(s, encoding='utf-8', strings_only=False, errors='strict'):
     """
@@ -133,4 +136,5 @@ def iri_to_uri(iri):
     # converted.
     if iri is None:
         return iri
+    import urllib
     return urllib.quote(smart_str(iri), safe="/#%[]=:;$&()+,!?*@'~")
@@ -0,0 +1,96 @@
+"""
+Replacing files atomically, so readers see the old or the new file and
+never a partial one.
+
+Sample usage:
+
+>>> from feedgenerator.utils.files import AtomicFile
+>>> with AtomicFile('/var/www/feeds/news.atom') as fp:
+...     feed.write(fp)
+"""
+import errno
+import os
+import tempfile
+
+# Readable by web servers running as other users, as files written with the
+# usual umask are; mkstemp would leave them readable by the owner only.
+DEFAULT_MODE = 0644
+
+
+def sync_directory(directory):
+    "Flushes renames in directory to disk, where the platform allows it."
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class AtomicFile(object):
+    """
+    A file written under a temporary name in path's directory and renamed
+    over path by commit(), or removed by discard(). As a context manager,
+    it commits if its block succeeds and discards otherwise.
+
+    mode -- the permissions of the file
+    sync -- whether to flush the file and the rename to disk, so the new
+            file survives a crash once commit() returns
+    """
+    def __init__(self, path, mode=DEFAULT_MODE, sync=True):
+        self.path = os.path.abspath(path)
+        self.sync = sync
+        fd, self.temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(self.path), prefix='.tmp')
+        self.file = os.fdopen(fd, 'w+b')
+        try:
+            os.fchmod(fd, mode)
+        except:
+            self.discard()
+            raise
+
+    def write(self, data):
+        self.file.write(data)
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def commit(self):
+        try:
+            self.file.flush()
+            if self.sync:
+                os.fsync(self.file.fileno())
+            self.file.close()
+            os.rename(self.temp_path, self.path)
+        except:
+            self.discard()
+            raise
+        if self.sync:
+            sync_directory(os.path.dirname(self.path))
+
+    def discard(self):
+        self.file.close()
+        try:
+            os.unlink(self.temp_path)
+        except OSError, e:
+            if e.errno != errno.ENOENT:
+                raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+
+def write_atomically(path, data, mode=DEFAULT_MODE, sync=True):
+    "Replaces the file path with one holding data, atomically."
+    with AtomicFile(path, mode, sync) as fp:
+        fp.write(data)
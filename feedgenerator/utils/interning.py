@@ -0,0 +1,81 @@
+"""
+Sharing of equal values (authors, categories, links) between entries.
+
+Sample usage:
+
+>>> from feedgenerator.utils.interning import InternPool
+>>> feed = Atom1Feed(title=u'News', author=u'Newsroom')
+>>> feed.intern_pool = InternPool()      # or Atom1Feed.intern_pool for all
+>>> feed.add_entry(title=u'...', updated=now, author=u'Jane Doe',
+...                categories=[{'term': u'politics'}])
+
+Entries added after that share one ({'name': u'Jane Doe'},) tuple and one
+({'term': u'politics'},) tuple between them.
+"""
+
+
+def _freeze(value):
+    """
+    Returns a hashable key equal for equal values, raising TypeError for
+    values that cannot be keyed.
+    """
+    cls = value.__class__
+    if cls is unicode:
+        return value
+    if cls is tuple or cls is list:
+        return (tuple, tuple([_freeze(item) for item in value]))
+    if cls is dict:
+        try:
+            # Most are dicts of strings.
+            return (dict, frozenset(value.iteritems()))
+        except TypeError:
+            return (dict, frozenset((key, _freeze(item))
+                                    for key, item in value.iteritems()))
+    if isinstance(value, dict):
+        return _freeze(dict(value))
+    if isinstance(value, (list, tuple)):
+        return _freeze(tuple(value))
+    hash(value)
+    return (cls, value)
+
+
+class InternPool(object):
+    """
+    Stores one instance of each distinct value passed to intern(), and hands
+    it out for all equal values. Lists come back as tuples.
+
+    Interned values are shared, so they must not be changed. The pool grows
+    with the number of distinct values and is never pruned; give it a scope
+    (a feed, a batch job, the process) whose values repeat.
+    """
+    def __init__(self):
+        self._values = {}
+
+    def __len__(self):
+        return len(self._values)
+
+    def intern(self, value):
+        "Returns the pooled value equal to value, adding it if needed."
+        try:
+            key = _freeze(value)
+        except TypeError:
+            return value
+        shared = self._values.get(key)
+        if shared is None:
+            shared = self._values.setdefault(key, self._share_parts(value))
+        return shared
+
+    def _share_parts(self, value):
+        if isinstance(value, dict):
+            return dict((self.intern(key), self.intern(item))
+                        for key, item in value.iteritems())
+        if isinstance(value, (list, tuple)):
+            return tuple(self.intern(item) for item in value)
+        return value
+
+    def clear(self):
+        self._values.clear()
+
+
+# A pool for process scope: Atom1Feed.intern_pool = default_pool
+default_pool = InternPool()
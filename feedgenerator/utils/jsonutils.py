@@ -0,0 +1,125 @@
+"""
+A streaming writer for JSON Feed documents, the JSON counterpart of
+feedgenerator.utils.xmlutils.
+"""
+import codecs
+import json
+from feedgenerator.utils.writers import CoalescingWriter
+
+
+def decode_strings(value, encoding):
+    """
+    Returns value with the byte strings in it (at any depth of dicts, lists
+    and tuples) decoded from encoding.
+    """
+    if isinstance(value, str):
+        return value.decode(encoding)
+    if isinstance(value, dict):
+        return dict((decode_strings(key, encoding),
+                     decode_strings(item, encoding))
+                    for key, item in value.iteritems())
+    if isinstance(value, (list, tuple)):
+        return [decode_strings(item, encoding) for item in value]
+    return value
+
+
+class JsonFeedGenerator(object):
+    """
+    Writes a JSON object member by member, followed by its "items" array
+    one item at a time, so no more than one item is held as JSON at once.
+    """
+    def __init__(self, out, encoding='utf-8', buffer_size=0, sort_keys=False):
+        self.writer = CoalescingWriter(out, buffer_size)
+        self._encoding = encoding
+        self._encode_text = codecs.getincrementalencoder(encoding)().encode
+        self._encode_json_unicode = json.JSONEncoder(
+            ensure_ascii=False, separators=(',', ':'),
+            sort_keys=sort_keys).encode
+        self._empty = True
+        self._items_started = False
+        self._marked_states = []
+
+    def wrap_encoder(self, wrapper):
+        "Encodes all output through wrapper(encode), e.g. to time it."
+        self._encode_text = wrapper(self._encode_text)
+
+    def _encode_json(self, value):
+        "Returns value as JSON text (unicode)."
+        try:
+            text = self._encode_json_unicode(value)
+            if isinstance(text, str):
+                text = text.decode('ascii')
+            return text
+        except UnicodeDecodeError:
+            # Non-ASCII byte strings are taken to be in the output encoding,
+            # as XMLGenerator.characters() takes them.
+            return self._encode_json_unicode(
+                decode_strings(value, self._encoding))
+
+    def _write(self, text):
+        self.writer.write(self._encode_text(text))
+
+    def _separator(self):
+        if self._empty:
+            self._empty = False
+            return u''
+        return u','
+
+    def startDocument(self):
+        # Writes the byte order mark of encodings that have one, so that
+        # encodeItem() never includes it.
+        self.writer.write(self._encode_text(u''))
+
+    def endDocument(self):
+        self.writer.flush()
+
+    def mark(self):
+        "Starts output that rollback() can take back, as CoalescingWriter."
+        self.writer.mark()
+        self._marked_states.append((self._empty, self._items_started))
+
+    def rollback(self):
+        self.writer.rollback()
+        self._empty, self._items_started = self._marked_states.pop()
+
+    def release(self):
+        self.writer.release()
+        self._marked_states.pop()
+
+    def tell(self):
+        return self.writer.tell()
+
+    def startObject(self):
+        self._write(u'{')
+        self._empty = True
+        self._items_started = False
+
+    def addMember(self, key, value):
+        "Adds a member to the object. Must not be called after addItem()."
+        assert not self._items_started
+        self._write(self._separator() + self._encode_json(key) + u':'
+                    + self._encode_json(value))
+
+    def addItem(self, value):
+        "Appends value to the object's items array."
+        self.addEncodedItem(self.encodeItem(value))
+
+    def encodeItem(self, value):
+        "Returns value as JSON in the output encoding, for addEncodedItem()."
+        return self._encode_text(self._encode_json(value))
+
+    def addEncodedItem(self, data):
+        "Appends an item encoded by encodeItem() to the items array."
+        if not self._items_started:
+            self._write(self._separator() + u'"items":[')
+            self._items_started = True
+            self._empty = True
+        if not self._empty:
+            self._write(u',')
+        self._empty = False
+        self.writer.write(data)
+
+    def endObject(self):
+        if not self._items_started:
+            self._write(self._separator() + u'"items":[')
+        self._write(u']}')
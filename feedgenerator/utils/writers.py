@@ -0,0 +1,88 @@
+"""
+Buffered and teeing writers shared by the XML and JSON generators.
+"""
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class CoalescingWriter(object):
+    """
+    Collects the byte strings written to it in a pre-sized buffer and writes
+    them on to out in blocks of up to buffer_size bytes. Larger strings are
+    written on directly. With a buffer_size of 0, every write goes through.
+
+    Whoever writes to it must call flush() when done.
+
+    mark() makes it hold on to everything written from then on, however
+    much that is, until rollback() discards it or release() lets it be
+    written on. Marks nest.
+    """
+    def __init__(self, out, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.out = out
+        self.buffer_size = buffer_size
+        self._buffer = bytearray(buffer_size)
+        self._used = 0
+        self._flushed = 0
+        self._marks = []
+
+    def write(self, data):
+        size = len(data)
+        used = self._used
+        if used + size > self.buffer_size and not self._marks:
+            self.flush()
+            if size >= self.buffer_size:
+                self.out.write(data)
+                self._flushed += size
+                return
+            used = 0
+        self._buffer[used:used + size] = data
+        self._used = used + size
+
+    def flush(self):
+        assert not self._marks, 'Cannot flush while marked.'
+        if self._used:
+            self.out.write(str(self._buffer[:self._used]))
+            self._flushed += self._used
+            self._used = 0
+
+    def tell(self):
+        "Returns the number of bytes written to it so far."
+        return self._flushed + self._used
+
+    def mark(self):
+        self._marks.append(self._used)
+
+    def marked(self):
+        "Returns everything written since the last mark()."
+        return str(self._buffer[self._marks[-1]:self._used])
+
+    def rollback(self):
+        "Discards everything written since the last mark()."
+        self._used = self._marks.pop()
+
+    def release(self):
+        "Keeps everything written since the last mark()."
+        self._marks.pop()
+
+
+class TeeWriter(object):
+    """
+    Writes everything written to it on to each of sinks, in order. A sink
+    is a file-like object or anything with an update() method, such as a
+    hashlib digest, so one render can write a file, a gzip.GzipFile and a
+    checksum at once.
+    """
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+        self._writes = [getattr(sink, 'write', None) or sink.update
+                        for sink in self.sinks]
+
+    def write(self, data):
+        for write in self._writes:
+            write(data)
+
+
+def to_file(outfile):
+    "Returns outfile, or a TeeWriter for it if it is a list or tuple of sinks."
+    if isinstance(outfile, (list, tuple)):
+        return TeeWriter(outfile)
+    return outfile
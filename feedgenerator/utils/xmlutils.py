@@ -1,9 +1,49 @@
 """
 Ported from django.utils.xmlutils.
+
+Modifications:
+    - output is encoded incrementally and coalesced into large writes.
 """
+import codecs
 from xml.sax.saxutils import XMLGenerator
+from feedgenerator.utils.writers import CoalescingWriter, DEFAULT_BUFFER_SIZE
+
 
 class SimplerXMLGenerator(XMLGenerator):
+    def __init__(self, out=None, encoding='iso-8859-1', buffer_size=0):
+        XMLGenerator.__init__(self, out, encoding)
+        if out is None:
+            import sys
+            out = sys.stdout
+        self.writer = CoalescingWriter(out, buffer_size)
+        self._encode = codecs.getincrementalencoder(encoding)('xmlcharrefreplace').encode
+        self._bind_write()
+        self._flush = self.writer.flush
+
+    def _bind_write(self):
+        write, encode = self.writer.write, self._encode
+        self._write = lambda text: write(encode(text))
+
+    def wrap_encoder(self, wrapper):
+        "Encodes all output through wrapper(encode), e.g. to time it."
+        self._encode = wrapper(self._encode)
+        self._bind_write()
+
+    def mark(self):
+        self.writer.mark()
+
+    def marked(self):
+        return self.writer.marked()
+
+    def rollback(self):
+        self.writer.rollback()
+
+    def release(self):
+        self.writer.release()
+
+    def tell(self):
+        return self.writer.tell()
+
     def addQuickElement(self, name, contents=None, attrs=None):
         "Convenience method for adding an element with no children"
         if attrs is None: attrs = {}
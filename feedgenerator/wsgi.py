@@ -0,0 +1,171 @@
+"""
+A WSGI application serving a feed.
+
+Sample usage:
+
+>>> from feedgenerator.wsgi import FeedApplication
+>>> application = FeedApplication(feed)
+
+or, to build the feed per request:
+
+>>> application = FeedApplication(lambda: build_feed())
+
+The ETag (the feed's fingerprint) and Last-Modified headers are computed
+from the feed's data without rendering it, so conditional requests that
+can be answered with 304 Not Modified never render the feed. HEAD requests
+get the headers only. Bodies are streamed: each block the render is
+coalesced into is passed to the server as soon as it is full, so large
+feeds start going out before they are fully rendered and are sent without
+a Content-Length. Headers and body all come from one snapshot of the feed,
+so they agree even if the feed changes meanwhile.
+
+Given a feedgenerator.delta.FeedHistory, the application also serves RFC
+3229 delta feeds.
+"""
+import calendar
+import email.utils
+from feedgenerator.delta import accepts_feed_delta, delta_feed
+from feedgenerator.generator import SyndicationFeed
+from feedgenerator.utils.timezone import is_aware
+
+
+def last_modified(feed):
+    """
+    Returns the latest of the feed's updated date and its entries' updated
+    and pubdate dates as a naive UTC datetime, or None if it has none.
+    Naive dates are taken to be in UTC.
+    """
+    dates = [feed.meta['updated']] if feed.meta.get('updated') else []
+    for entry in feed:
+        for key in ('updated', 'pubdate'):
+            if entry.get(key) is not None:
+                dates.append(entry[key])
+    dates = [date.replace(tzinfo=None) - date.utcoffset()
+             if is_aware(date) else date
+             for date in dates]
+    return max(dates) if dates else None
+
+
+def http_date(date):
+    "Formats a naive UTC datetime for HTTP headers."
+    return email.utils.formatdate(calendar.timegm(date.utctimetuple()),
+                                  usegmt=True)
+
+
+def parse_http_date(value):
+    "Returns the seconds since the epoch of an HTTP date, or None."
+    parsed = email.utils.parsedate_tz(value)
+    if parsed is None:
+        return None
+    return email.utils.mktime_tz(parsed)
+
+
+def etag_matches(header, etag):
+    "Whether an If-None-Match header matches etag (weakly compared)."
+    if header.strip() == '*':
+        return True
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class _BlockCollector(object):
+    "Collects the blocks a render produces, for a WSGI response body."
+    def __init__(self):
+        self.blocks = []
+        self.write = self.blocks.append
+
+
+class FeedApplication(object):
+    """
+    Serves a feed with its mime_type over WSGI, answering conditional GET
+    and HEAD requests with 304 Not Modified where possible.
+
+    feed -- a SyndicationFeed, or a callable returning one for each request
+    encoding -- the encoding to render the feed in
+    history -- a FeedHistory to record served versions in and serve delta
+               feeds from (optional)
+    """
+    def __init__(self, feed, encoding='utf-8', history=None):
+        self.feed = feed
+        self.encoding = encoding
+        self.history = history
+
+    def get_feed(self, environ):
+        if isinstance(self.feed, SyndicationFeed):
+            return self.feed
+        return self.feed()
+
+    def snapshot(self, feed):
+        """
+        Returns feed with its entries as they are now, unaffected by entries
+        added to feed later.
+        """
+        if hasattr(feed, 'snapshot'):
+            return feed.snapshot()
+        return feed.copy()
+
+    def body(self, feed):
+        """
+        Yields feed rendered in the application's encoding, block by block
+        as the render produces them.
+        """
+        collector = _BlockCollector()
+        for _ in feed.write_stream_steps(collector, None, self.encoding):
+            for block in collector.blocks:
+                yield block
+            del collector.blocks[:]
+
+    def etag(self, feed):
+        return '"%s"' % feed.fingerprint()
+
+    def content_type(self, feed):
+        return '%s; charset=%s' % (feed.mime_type.split(';')[0],
+                                   self.encoding)
+
+    def is_not_modified(self, environ, etag, modified):
+        if 'HTTP_IF_NONE_MATCH' in environ:
+            return etag_matches(environ['HTTP_IF_NONE_MATCH'], etag)
+        since = parse_http_date(environ.get('HTTP_IF_MODIFIED_SINCE', ''))
+        if since is None or modified is None:
+            return False
+        return calendar.timegm(modified.utctimetuple()) <= since
+
+    def __call__(self, environ, start_response):
+        method = environ['REQUEST_METHOD']
+        if method not in ('GET', 'HEAD'):
+            start_response('405 Method Not Allowed',
+                           [('Allow', 'GET, HEAD'),
+                            ('Content-Type', 'text/plain')])
+            return ['Method not allowed.\n']
+        feed = self.snapshot(self.get_feed(environ))
+        etag = self.etag(feed)
+        modified = last_modified(feed)
+        headers = [('ETag', etag)]
+        if modified is not None:
+            headers.append(('Last-Modified', http_date(modified)))
+        if self.is_not_modified(environ, etag, modified):
+            start_response('304 Not Modified', headers)
+            return []
+        status = '200 OK'
+        if self.history is not None:
+            self.history.record(feed, etag)
+            base = environ.get('HTTP_IF_NONE_MATCH', '').split(',')[0].strip()
+            if base.startswith('W/'):
+                base = base[2:]
+            if base and accepts_feed_delta(environ):
+                delta = delta_feed(feed, self.history, base)
+                if delta is not None:
+                    feed, status = delta, '226 IM Used'
+                    headers.extend([('IM', 'feed'),
+                                    ('Cache-Control', 'no-store, im')])
+        headers.append(('Content-Type', self.content_type(feed)))
+        if method == 'HEAD':
+            start_response(status, headers)
+            return []
+        start_response(status, headers)
+        return self.body(feed)